@@ -22,6 +22,8 @@ Works in: Google Colab, GitHub Actions, local Python
 # SECTION 12 - EMAIL NEWSLETTER
 # SECTION 13 - EVENTS CALENDAR
 # SECTION 14 - MAIN ORCHESTRATOR
+# SECTION 15 - BENCHMARKS (python recharge_scanner_v4.py --bench <name>)
+# SECTION 16 - BACKTEST   (python recharge_scanner_v4.py --backtest [configs])
 # =============================================================================
 """
 
@@ -29,14 +31,18 @@ Works in: Google Colab, GitHub Actions, local Python
 # SECTION 0 - IMPORTS & CONFIG
 # =============================================================================
 
-import os, sys, json, re, time, logging, subprocess, html as _html
-from datetime import datetime, timedelta
-from collections import defaultdict, Counter
+import os, sys, json, re, time, math, random, logging, subprocess, hashlib, sqlite3, gzip, html as _html
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, Counter, namedtuple
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
-from urllib.parse import quote, urlparse
+from urllib.parse import quote, urlparse, parse_qsl, urlencode
 from difflib import SequenceMatcher
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from bisect import bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed
+from types import SimpleNamespace
 import xml.etree.ElementTree as ET
 
 _log_fmt = "%(asctime)s [%(levelname)s] %(message)s"
@@ -80,6 +86,20 @@ W = {
     "anime": .03, "sitemap": .02, "wiki": .01, "freetogame": .01,
 }
 
+# Markets scanned by the region-aware sources (Google News RSS, Oxylabs). Set SCAN_MARKETS=US,UK,DE,FR,NL
+# to scan several at once; the first one is the primary market (events, fallbacks).
+MARKETS = {
+    "US": {"geo":"United States",  "locale":"en-US", "hl":"en-US", "gl":"US", "ceid":"US:en"},
+    "UK": {"geo":"United Kingdom", "locale":"en-GB", "hl":"en-GB", "gl":"GB", "ceid":"GB:en"},
+    "DE": {"geo":"Germany",        "locale":"de-DE", "hl":"de",    "gl":"DE", "ceid":"DE:de"},
+    "FR": {"geo":"France",         "locale":"fr-FR", "hl":"fr",    "gl":"FR", "ceid":"FR:fr"},
+    "NL": {"geo":"Netherlands",    "locale":"nl-NL", "hl":"nl",    "gl":"NL", "ceid":"NL:nl"},
+    "ES": {"geo":"Spain",          "locale":"es-ES", "hl":"es",    "gl":"ES", "ceid":"ES:es"},
+    "IT": {"geo":"Italy",          "locale":"it-IT", "hl":"it",    "gl":"IT", "ceid":"IT:it"},
+    "PL": {"geo":"Poland",         "locale":"pl-PL", "hl":"pl",    "gl":"PL", "ceid":"PL:pl"},
+}
+SCAN_MARKETS = [m for m in (x.strip().upper() for x in os.environ.get("SCAN_MARKETS","US").split(",")) if m in MARKETS] or ["US"]
+
 CONF = {1: 0.55, 2: 0.75, 3: 0.90, 4: 1.0}
 CONF_DEFAULT = 1.0
 FUZZ_T = 0.82
@@ -309,7 +329,7 @@ NEWS_TOPICS = list(dict.fromkeys(_AUTO_TOPICS + [
 
 def _install():
     pkgs = ["google-genai","pytrends","python-docx","gspread","google-auth",
-            "requests","beautifulsoup4","feedparser","cryptography"]
+            "requests","beautifulsoup4","feedparser","cryptography","numpy"]
     for p in pkgs:
         mod = p.replace("-","_").split("[")[0]
         if mod == "python_docx": mod = "docx"
@@ -325,7 +345,8 @@ try:
 except ImportError: HAS_CRYPTO = False
 
 import requests
-from bs4 import BeautifulSoup
+import numpy as np
+from bs4 import BeautifulSoup, SoupStrainer
 import feedparser
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
@@ -344,6 +365,11 @@ try:
     HAS_GSPREAD = True
 except ImportError: HAS_GSPREAD = False
 
+try:
+    import lxml.html as _lxhtml
+    HAS_LXML = True
+except ImportError: HAS_LXML = False
+
 try:
     from pytrends.request import TrendReq
     HAS_PYTRENDS = True
@@ -358,12 +384,138 @@ class Signal:
     source: str; title: str; desc: str = ""; url: str = ""
     score: float = 0.0; meta: dict = field(default_factory=dict)
 
+    @property
+    def cats(self): return self.meta.get("cats", [])
+
+class SignalMeta(Mapping):
+    """Read-only meta of a SignalTable row: an interned key tuple and a value tuple, cats included."""
+    __slots__ = ("_k", "_v")
+    def __init__(self, k, v): self._k = k; self._v = v
+    def __getitem__(self, key):
+        k = self._k
+        if key in k: return self._v[k.index(key)]
+        raise KeyError(key)
+    def get(self, key, default=None):
+        k = self._k
+        return self._v[k.index(key)] if key in k else default
+    def __contains__(self, key): return key in self._k
+    def __iter__(self): return iter(self._k)
+    def __len__(self): return len(self._k)
+    def __repr__(self): return f"SignalMeta({dict(self)!r})"
+
+_META_KEYS = {}                    # key tuples shared by every row (and table) with the same meta layout
+_NO_META = SignalMeta((), ())
+
+class SignalRow:
+    """Read view of one SignalTable row; has the same attributes as Signal. meta is the stored
+    SignalMeta itself (read-only), so writes fail loudly instead of being dropped."""
+    __slots__ = ("t", "i")
+    def __init__(self, t, i): self.t = t; self.i = i
+    source = property(lambda r: r.t.src_names[r.t.src[r.i]])
+    title = property(lambda r: r.t.title[r.i])
+    desc = property(lambda r: r.t.desc[r.i])
+    url = property(lambda r: r.t.url[r.i])
+    cats = property(lambda r: r.t.meta[r.i].get("cats", ()))
+    score = property(lambda r: float(r.t.score[r.i]), lambda r, v: r.t.score.__setitem__(r.i, v))
+    meta = property(lambda r: r.t.meta[r.i])
+    def __repr__(self): return f"SignalRow({self.source!r}, {self.title[:40]!r}, score={self.score})"
+
+class SignalTable(Mapping):
+    """All signals of a run in columns, readable as the old {source: [Signal]} dict.
+
+    Source names, categories, descriptions and meta keys are interned and scores are one float64
+    column. all_sig[src] gives SignalRow views, so per-signal code is unchanged; the scoring and
+    dedup stages read the columns, and the busy fetchers fill a table of their own with add()."""
+
+    def __init__(self, cap=1024):
+        self.src_names = []; self._src_ids = {}
+        self.cat_names = []; self._cat_ids = {}; self._catsets = {}; self._strs = {}
+        self._src = np.zeros(cap, np.int16); self._score = np.zeros(cap, np.float64); self.n = 0
+        self.title = []; self.desc = []; self.url = []; self.cats = []; self.meta = []
+
+    src = property(lambda t: t._src[:t.n])       # source id per row
+    score = property(lambda t: t._score[:t.n])   # writable view of the score column
+
+    def source_id(self, name):
+        sid = self._src_ids.get(name)
+        if sid is None:
+            sid = self._src_ids[name] = len(self.src_names); self.src_names.append(name)
+        return sid
+
+    def _catset(self, names):
+        """(category ids, category names) for a cats list, both shared between rows."""
+        ids = []
+        for c in names:
+            k = self._cat_ids.get(c)
+            if k is None: k = self._cat_ids[c] = len(self.cat_names); self.cat_names.append(c)
+            ids.append(k)
+        ids = tuple(ids)
+        cs = self._catsets.get(ids)
+        if cs is None: cs = self._catsets[ids] = (ids, tuple(self.cat_names[k] for k in ids))
+        return cs
+
+    def _freeze(self, meta):
+        """SignalMeta and category ids for a fetcher's meta dict."""
+        ids, names = self._catset(meta.get("cats") or ())
+        strs = self._strs; ks = []; vs = []
+        for k, v in meta.items():
+            if k == "cats":
+                if not names: continue
+                v = names
+            elif type(v) is str: v = strs.setdefault(v, v)
+            ks.append(k); vs.append(v)
+        if not ks: return _NO_META, ids
+        ks = tuple(ks)
+        return SignalMeta(_META_KEYS.setdefault(ks, ks), tuple(vs)), ids
+
+    def add(self, source, title, desc="", url="", score=0.0, meta=None):
+        """Append one row from its fields, without building a Signal; returns the row id."""
+        i = self.n
+        if i == len(self._score):
+            self._src = np.concatenate([self._src, np.zeros_like(self._src)])
+            self._score = np.concatenate([self._score, np.zeros_like(self._score)])
+        sid = self.source_id(source)
+        self._src[i] = sid; self._score[i] = score
+        if isinstance(meta, SignalMeta): ids = self._catset(meta.get("cats", ()))[0]
+        else: meta, ids = self._freeze(meta or {})
+        self.title.append(title); self.desc.append(self._strs.setdefault(desc, desc)); self.url.append(url)
+        self.cats.append(ids); self.meta.append(meta)
+        self.n += 1
+        return i
+
+    def append(self, sig):
+        """Copy a Signal into the table; returns its row view."""
+        return SignalRow(self, self.add(sig.source, sig.title, sig.desc, sig.url, sig.score, sig.meta))
+
+    def extend(self, source, sigs):
+        """Append a fetcher's results (Signals or a SignalTable); the source is listed even when it returned nothing."""
+        self.source_id(source)
+        if isinstance(sigs, SignalTable):
+            for i in range(sigs.n):
+                self.add(sigs.src_names[sigs._src[i]], sigs.title[i], sigs.desc[i], sigs.url[i], sigs._score[i], sigs.meta[i])
+        else:
+            for s in sigs: self.append(s)
+
+    def row_ids(self, source):
+        sid = self._src_ids.get(source)
+        return np.flatnonzero(self.src == sid) if sid is not None else np.zeros(0, np.intp)
+
+    def rows(self): return [SignalRow(self, i) for i in range(self.n)]
+    def __getitem__(self, source):
+        if source not in self._src_ids: raise KeyError(source)
+        return [SignalRow(self, i) for i in self.row_ids(source).tolist()]
+    def __iter__(self): return iter(self.src_names)
+    def __len__(self): return len(self.src_names)
+
 @dataclass
 class Candidate:
     title: str; signals: List[Signal] = field(default_factory=list)
     sources: int = 0; score: float = 0.0; url: str = ""
     category: str = ""; categories: List[str] = field(default_factory=list)
     biz_category: str = "GMG"; biz_categories: List[str] = field(default_factory=list)
+    markets: List[str] = field(default_factory=list)   # empty = only market-agnostic sources
+    entity: str = ""                                     # e.g. "GTA 6", set by rollup
+    members: List[str] = field(default_factory=list)   # headlines of candidates rolled up into this one
 
 @dataclass
 class ScoreSpec:
@@ -384,18 +536,26 @@ SCORE_SPECS = {
 }
 
 def normalize_scores(all_sig):
-    """Normalize all signal scores to a consistent 0-100 scale per source."""
-    for source, signals in all_sig.items():
-        if not signals: continue
-        spec = SCORE_SPECS.get(source, ScoreSpec())
-        raw_scores = [s.score for s in signals]
-        src_min, src_max = min(raw_scores), max(raw_scores)
-        for s in signals:
-            if src_max > src_min:
-                normalized = spec.floor + (s.score - src_min) / (src_max - src_min) * (spec.ceiling - spec.floor)
-            else:
-                normalized = (spec.floor + spec.ceiling) / 2
-            s.score = round(min(100, max(0, normalized)), 1)
+    """Normalize all signal scores to a consistent 0-100 scale per source: one grouped min-max
+    over the SignalTable score column (or the gathered scores of a {source: [Signal]} dict)."""
+    table = isinstance(all_sig, SignalTable)
+    if table: names, g, x = all_sig.src_names, all_sig.src, all_sig.score
+    else:
+        names = list(all_sig); sigs = [s for v in all_sig.values() for s in v]
+        g = np.repeat(np.arange(len(names)), [len(v) for v in all_sig.values()])
+        x = np.fromiter((s.score for s in sigs), np.float64, len(sigs))
+    if not len(x): return
+    lo = np.full(len(names), np.inf); hi = np.full(len(names), -np.inf)
+    np.minimum.at(lo, g, x); np.maximum.at(hi, g, x)
+    specs = [SCORE_SPECS.get(n, ScoreSpec()) for n in names]
+    floor = np.array([sp.floor for sp in specs])[g]; ceiling = np.array([sp.ceiling for sp in specs])[g]
+    src_min = lo[g]; span = (hi - lo)[g]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = np.where(span > 0, floor + (x - src_min) / span * (ceiling - floor), (floor + ceiling) / 2)
+    normalized = np.array([round(v, 1) for v in np.clip(normalized, 0, 100).tolist()])   # Python round, as comp_score
+    if table: x[:] = normalized
+    else:
+        for s, v in zip(sigs, normalized.tolist()): s.score = v
 
 # =============================================================================
 # SECTION 3 - UTILITIES
@@ -450,51 +610,380 @@ def GET(url, headers=None, timeout=15, retries=2):
             if i < retries: time.sleep(1.5 * (2 ** i))
     return None
 
-def fuzz(a, b, t=FUZZ_T):
-    a2 = re.sub(r'[^a-z0-9 ]','',a.lower())
-    b2 = re.sub(r'[^a-z0-9 ]','',b.lower())
-    if not a2 or not b2: return False
-    # Number guard: if both contain numbers and they differ, reject
-    nums_a = re.findall(r'\d+', a2)
-    nums_b = re.findall(r'\d+', b2)
-    if nums_a and nums_b and nums_a != nums_b: return False
-    return SequenceMatcher(None,a2,b2).ratio() >= t
-
-def cats(text):
-    lo = text.lower()
-    matched = []
-    for c, kws in KW.items():
-        hits = [k for k in kws if k.lower() in lo]
-        if hits:
-            matched.append(c)
-            log.debug(f"  KW match: '{text[:60]}' -> {c} (matched: {', '.join(hits[:3])})")
-    return matched
+_FETCH_CACHE = {}   # key -> Future[result], shared by every fetcher for the whole run
+_FETCH_LOCK = _threading.Lock()
+
+def _run_once(key, fn):
+    """Compute fn() once per run for key; concurrent callers wait on the first computation."""
+    with _FETCH_LOCK:
+        fut = _FETCH_CACHE.get(key); owner = fut is None
+        if owner: fut = _FETCH_CACHE[key] = Future()
+    if not owner: return fut.result()
+    try: res = fn()
+    except Exception as e: fut.set_exception(e); raise
+    fut.set_result(res); return res
+
+# --- CPU-heavy parsing (HTML soup, feeds) runs in a process pool so it doesn't hold the GIL
+# --- while the fetcher threads wait on the network. Workers return plain extracted data only.
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", "2"))   # 0 = parse inline in the calling thread
+PARSE_STATS = defaultdict(lambda: [0, 0.0, 0.0, 0])          # kind -> [docs, total_s, max_s, bytes]
+_PARSE_POOL = None
+_PARSE_LOCK = _threading.Lock()
+
+def _timed(fn, *args):
+    t0 = time.perf_counter(); res = fn(*args)
+    return res, time.perf_counter() - t0
+
+def start_parse_pool():
+    """Create the parse pool and fork all of its workers up front, before fetcher threads start
+    (forking a process that is running other threads is what we want to avoid). Only the first
+    call can create it, and only while this is the sole thread; parse_offload never forks."""
+    global _PARSE_POOL
+    with _PARSE_LOCK:
+        if _PARSE_POOL is not None or PARSE_WORKERS <= 0: return _PARSE_POOL or None
+        if _threading.active_count() > 1:
+            log.debug("Parse pool not started: other threads are running, parsing inline"); _PARSE_POOL = False
+            return None
+        try:
+            import multiprocessing as _mp
+            _PARSE_POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=_mp.get_context("fork"))
+            for f in [_PARSE_POOL.submit(time.sleep, 0.05) for _ in range(PARSE_WORKERS)]: f.result()
+        except Exception as e:
+            log.debug(f"Parse pool unavailable, parsing inline: {e}"); _PARSE_POOL = False
+    return _PARSE_POOL or None
+
+def stop_parse_pool():
+    """Shut the pool down for good: straggler threads that parse after this run inline."""
+    global _PARSE_POOL
+    with _PARSE_LOCK:
+        if _PARSE_POOL: _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+        _PARSE_POOL = False
+
+def parse_offload(fn, doc, *args, kind="html"):
+    """Run parser fn(doc, *args) in the parse pool (inline if there is none) and record its parse time."""
+    pool = _PARSE_POOL or None
+    res = None
+    if pool:
+        try: res, took = pool.submit(_timed, fn, doc, *args).result()
+        except Exception as e:   # broken pool / unpicklable result: fall back to inline parsing
+            log.debug(f"Parse pool error ({kind}): {type(e).__name__}: {e}"); res = None
+    if res is None: res, took = _timed(fn, doc, *args)
+    st = PARSE_STATS[kind]
+    with _PARSE_LOCK:
+        st[0] += 1; st[1] += took; st[2] = max(st[2], took); st[3] += len(doc)
+    log.debug(f"  Parsed {kind} doc ({len(doc)/1024:.0f} KB) in {took*1000:.1f} ms")
+    return res
+
+def log_parse_stats():
+    for kind, (n, tot, mx, size) in sorted(PARSE_STATS.items()):
+        log.info(f"  Parsing [{kind}]: {n} docs, {size/1048576:.1f} MB, {tot:.2f}s total "
+                 f"(avg {tot/n*1000:.0f} ms, max {mx*1000:.0f} ms)")
+
+_FEED_KEYS = ("title","link","published","updated","published_parsed","updated_parsed")
+
+def _parse_feed(content, url):
+    feed = feedparser.parse(content, response_headers={"content-location": url})
+    return SimpleNamespace(entries=[{k: e.get(k) for k in _FEED_KEYS if e.get(k) is not None} for e in feed.entries])
+
+# Extractors only look at the elements they use: a C-level lxml tree when lxml is installed,
+# otherwise html.parser restricted by a SoupStrainer. Page text is taken without building a tree.
+_HEADINGS = SoupStrainer(["title","h1","h2","h3"])
+_H1_H3 = SoupStrainer(["h1","h2","h3"])
+_ALT_LINKS = SoupStrainer("link", rel="alternate")
+_BLOG_CLASS_RE = re.compile(r"post|article|blog|card|entry", re.I)
+_BLOG_HREF_RE = re.compile(r"/blog/|/post/|/article/|/news/|/hub/")
+_BLOG_BLOCKS = SoupStrainer(["article","div"], class_=_BLOG_CLASS_RE)
+_BLOG_LINKS = SoupStrainer("a", href=_BLOG_HREF_RE)
+_NOTEXT_RE = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+def _page_text(html, limit=5000):
+    """Visible text of a page: drop script/style/comment blocks, strip tags, collapse whitespace."""
+    return " ".join(_html.unescape(_TAG_RE.sub(" ", _NOTEXT_RE.sub(" ", html))).split())[:limit]
+
+def _lx_root(html):
+    """lxml tree for html, or None (no lxml, empty doc, or a str with an XML encoding declaration)."""
+    if not HAS_LXML or not html.strip(): return None
+    try: return _lxhtml.document_fromstring(html)
+    except Exception: return None
+
+def _lx_text(el): return " ".join(el.text_content().split())
+
+def _headings(html, tags, strainer):
+    root = _lx_root(html)
+    if root is not None: return [_lx_text(t) for t in root.iter(*tags)]
+    return [t.get_text(strip=True) for t in BeautifulSoup(html, "html.parser", parse_only=strainer).find_all(list(tags))]
+
+def _extract_page(html):
+    """Competitor homepage: leading visible text plus h1-h3/title texts."""
+    return {"text": _page_text(html), "headings": _headings(html, ("title","h1","h2","h3"), _HEADINGS)}
+
+def _extract_headings(html, limit=10):
+    return _headings(html, ("h1","h2","h3"), _H1_H3)[:limit]
+
+def _extract_feed_links(html):
+    """<link rel="alternate"> feed URLs advertised by a page, as (href, type)."""
+    root = _lx_root(html)
+    links = ([l for l in root.iter("link") if "alternate" in (l.get("rel") or "").lower().split()] if root is not None
+             else BeautifulSoup(html, "html.parser", parse_only=_ALT_LINKS).find_all("link", rel="alternate"))
+    return [(l.get("href",""), l.get("type","")) for l in links]
+
+def _extract_blog_articles(html):
+    """Article-like blocks on a blog index page, as (title, href, date) with titles of 10+ chars."""
+    root = _lx_root(html)
+    if root is not None:
+        articles = [e for e in root.iter("article","div") if _BLOG_CLASS_RE.search(e.get("class") or "")]
+        if not articles:
+            # Fallback: just find all links that look like blog posts
+            articles = [e for e in root.iter("a") if _BLOG_HREF_RE.search(e.get("href") or "")]
+        find = lambda el, tags, attr=None: next((e for e in el.iter(*tags) if attr is None or e.get(attr) is not None), None)
+        tag, text = (lambda el: el.tag), _lx_text
+    else:
+        articles = BeautifulSoup(html, "html.parser", parse_only=_BLOG_BLOCKS).find_all(["article","div"], class_=_BLOG_CLASS_RE)
+        if not articles:
+            articles = BeautifulSoup(html, "html.parser", parse_only=_BLOG_LINKS).find_all("a", href=_BLOG_HREF_RE)
+        find = lambda el, tags, attr=None: el.find(list(tags), **({attr: True} if attr else {}))
+        tag, text = (lambda el: el.name), (lambda el: el.get_text(strip=True))
+    found = []
+    for art in articles[:25]:
+        h = find(art, ("h1","h2","h3","h4"))
+        if h is not None: title = text(h)
+        elif tag(art) == "a": title = text(art)
+        else: continue
+        if not title or len(title) < 10: continue
+        link_el = find(art, ("a",), "href") if tag(art) != "a" else art
+        time_el = find(art, ("time",))
+        found.append((title, link_el.get("href","") if link_el is not None else "",
+                      (time_el.get("datetime") or "")[:10] if time_el is not None else ""))
+    return found
+
+_SITEMAP_NS = {"s":"http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+def _extract_sitemap(content, cutoff):
+    """Sitemap XML -> (child sitemap locs, [(url, lastmod)] modified on/after cutoff)."""
+    try: root = ET.fromstring(content)
+    except ET.ParseError: return [], []
+    subs = [loc.text.strip() for sm in root.findall("s:sitemap", _SITEMAP_NS)
+            for loc in [sm.find("s:loc", _SITEMAP_NS)] if loc is not None and loc.text]
+    results = []
+    for url_el in root.findall("s:url", _SITEMAP_NS):
+        loc = url_el.find("s:loc", _SITEMAP_NS); mod = url_el.find("s:lastmod", _SITEMAP_NS)
+        if loc is None or mod is None: continue
+        loc_text = loc.text.strip() if loc.text else ""
+        mod_text = mod.text.strip()[:10] if mod.text else ""
+        try:
+            if datetime.strptime(mod_text, "%Y-%m-%d") >= cutoff: results.append((loc_text, mod_text))
+        except ValueError: continue
+    return subs, results
+
+def fetch_feed(url, headers=None, timeout=15):
+    """Fetch and parse an RSS/Atom feed via GET, once per URL per run. Entries are plain dicts."""
+    def _get():
+        r = GET(url, headers=headers, timeout=timeout)
+        if not r or not r.content: return SimpleNamespace(entries=[])
+        return parse_offload(_parse_feed, r.content, url, kind="feed")
+    return _run_once(("feed", url), _get)
+
+def fetch_feeds(urls, workers=8, timeout=10):
+    """Fetch many feeds concurrently. Returns {url: entries}; failed feeds map to []."""
+    out = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futs = {pool.submit(fetch_feed, u, timeout=timeout): u for u in dict.fromkeys(urls)}
+        for fut in as_completed(futs):
+            try: out[futs[fut]] = fut.result().entries
+            except Exception as e: log.debug(f"Feed {futs[fut][:90]}: {e}"); out[futs[fut]] = []
+    return out
+
+def gnews_url(query, market=None, when="7d"):
+    """Google News RSS search URL for a query in a market (defaults to the primary market)."""
+    m = MARKETS[market or SCAN_MARKETS[0]]
+    return (f"https://news.google.com/rss/search?q={quote(query)}{f'+when:{when}' if when else ''}"
+            f"&hl={m['hl']}&gl={m['gl']}&ceid={m['ceid']}")
+
+OXYLABS_WORKERS = int(os.environ.get("OXYLABS_WORKERS", "5"))
+OXYLABS_LIMITER = RateLimiter(calls_per_minute=int(os.environ.get("OXYLABS_RPM", "200")))   # shared by every pool
+OXYLABS_RETRIES = 3
+
+def oxylabs_news(query, market=None, tbs="qdr:d", limit=10):
+    """Google News results for a query in a market via Oxylabs, once per (query, market, window) per run."""
+    market = market or SCAN_MARKETS[0]; m = MARKETS[market]
+    def _search():
+        payload = {
+            "source": "google_search", "query": query, "parse": True,
+            "context": [{"key": "tbm", "value": "nws"}, {"key": "tbs", "value": tbs}],
+            "geo_location": m["geo"], "locale": m["locale"], "limit": limit,
+        }
+        for i in range(OXYLABS_RETRIES + 1):
+            OXYLABS_LIMITER.wait()
+            r = requests.post("https://realtime.oxylabs.io/v1/queries",
+                auth=(OXYLABS_USER, OXYLABS_PASS), json=payload, timeout=30)
+            if r.status_code not in (429, 500, 502, 503, 504) or i == OXYLABS_RETRIES: break
+            try: delay = min(float(r.headers.get("Retry-After") or ""), 30)
+            except ValueError: delay = min(1.5 * (2 ** i), 10)
+            log.info(f"Oxylabs {r.status_code} for '{query[:40]}' ({market}), waiting {delay:.1f}s")
+            time.sleep(delay)
+        if r.status_code != 200: return []
+        results = r.json().get("results", [])
+        if not results: return []
+        content = results[0].get("content", {})
+        if not isinstance(content, dict): return []
+        return content.get("results", {}).get("main", [])
+    return _run_once(("oxylabs", query, market, tbs, limit), _search)
+
+def _tag_market(meta, market):
+    """Record in a signal's meta that it (or an identical story) was also seen in another market."""
+    mk = meta.setdefault("markets", [])
+    if market not in mk: mk.append(market)
+    return meta
+
+# --- Title normalization: one pass per unique string, shared by fetcher keys, appeal filter and dedup
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+_NON_ALNUM_SP = re.compile(r'[^a-z0-9 ]')
+_DIGITS = re.compile(r'\d+')
+_NOT_MASS_APPEAL = re.compile("|".join(map(re.escape, [
+    "my ","i ","i'm","i've","me ","just got","finally",
+    "my friend","helped me","unpopular opinion","does anyone",
+    "question about","need help","eli5","ama"])))
+_ROMANS = {'vi':'6','vii':'7','viii':'8','ix':'9','iv':'4','iii':'3','ii':'2','xl':'40','xx':'20','xv':'15','x':'10'}
+
+TitleNorm = namedtuple("TitleNorm", "key norm nums tokens appeal")
+
+@lru_cache(maxsize=65536)
+def norm_title(t):
+    """TitleNorm for a title: dedup key (alnum of first 80 chars), normalized words (roman numerals
+    converted), number tokens, token set, and whether it reads as mass-appeal rather than personal."""
+    lo = t.lower()
+    norm = " ".join(_ROMANS.get(w, w) for w in _NON_ALNUM_SP.sub('', lo).split())
+    return TitleNorm(_NON_ALNUM.sub('', lo[:80]), norm, tuple(_DIGITS.findall(norm)),
+                     frozenset(norm.split()), _NOT_MASS_APPEAL.search(lo) is None)
+
+class KeywordMatcher:
+    """All KW keywords compiled into one regex, matched in a single pass over lower-cased text.
+
+    The pattern is a longest-first alternation inside a lookahead, so finditer yields the
+    longest keyword starting at every position (overlaps included). Each such keyword maps to
+    the categories of every keyword it contains, which gives exactly the same result as testing
+    each keyword as a substring. With word_boundary=True keywords only match as whole words."""
+    def __init__(self, table, word_boundary=False):
+        self.cats = list(table)
+        owners = defaultdict(set)
+        for i, kws in enumerate(table.values()):
+            for k in kws: owners[k.lower()].add(i)
+        kws = sorted(owners, key=lambda k: (-len(k), k))
+        alt = self._trie_pattern(kws)
+        if word_boundary:
+            self.rx = re.compile(rf"(?<!\w)(?=({alt})(?!\w))")
+            inner = lambda k, K: re.search(rf"(?<!\w){re.escape(k)}(?!\w)", K) is not None
+        else:
+            self.rx = re.compile(f"(?=({alt}))")
+            inner = lambda k, K: k in K
+        # keyword -> [(category index, contained keyword), ...] in category order
+        self.closure = {K: sorted((i, k) for k in kws if len(k) <= len(K) and inner(k, K) for i in owners[k])
+                        for K in kws}
+
+    @staticmethod
+    def _trie_pattern(words):
+        """Prefix-factored alternation (a trie as a regex). Optional tails are greedy, so the
+        longest keyword at a position is tried first."""
+        trie = {}
+        for w in words:
+            node = trie
+            for ch in w: node = node.setdefault(ch, {})
+            node[""] = {}
+        def build(node):
+            alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+            if not alts: return ""
+            body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+            if "" not in node: return body
+            return (body if len(alts) > 1 or len(alts[0]) == 1 else f"(?:{body})") + "?"
+        return build(trie)
+
+    def match(self, text):
+        """Return {category: [matched keywords]} in KW order."""
+        found = {}
+        for K in {m.group(1) for m in self.rx.finditer(text.lower())}:
+            for i, k in self.closure[K]: found.setdefault(i, set()).add(k)
+        return {self.cats[i]: sorted(found[i]) for i in sorted(found)}
+
+KW_WORD_BOUNDARY = os.environ.get("KW_WORD_BOUNDARY", "0") == "1"
+KW_MATCHER = KeywordMatcher(KW, word_boundary=KW_WORD_BOUNDARY)
+
+CLASSIFY_CACHE_SIZE = int(os.environ.get("CLASSIFY_CACHE_SIZE", "50000"))
+KW_TRACE_RATE = float(os.environ.get("KW_TRACE_RATE", "0"))   # fraction of classified texts traced at DEBUG
+KW_STATS = {"texts": 0, "matched": 0, "cats": Counter(), "keywords": Counter()}
+_KW_STATS_LOCK = _threading.Lock()
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify(norm):
+    matched = KW_MATCHER.match(norm)
+    with _KW_STATS_LOCK:
+        KW_STATS["texts"] += 1; KW_STATS["matched"] += bool(matched)
+        for c, hits in matched.items():
+            KW_STATS["cats"][c] += 1; KW_STATS["keywords"].update(hits)
+    if KW_TRACE_RATE and random.random() < KW_TRACE_RATE:
+        for c, hits in matched.items(): log.debug("  KW match: %r -> %s (matched: %s)", norm[:60], c, ", ".join(hits[:3]))
+    kc = tuple(matched)
+    return kc, tuple(dict.fromkeys(BIZ_CATS.get(c, "GMG") for c in kc)) or ("GMG",)
+
+def log_kw_stats():
+    """Per-run keyword classification counters (unique texts, per category, top keywords)."""
+    ci = _classify.cache_info()
+    log.info(f"  Classification: {KW_STATS['texts']} unique texts ({KW_STATS['matched']} matched), {ci.hits} cache hits")
+    log.info("  Top categories: " + ", ".join(f"{c} {n}" for c, n in KW_STATS["cats"].most_common(10)))
+    log.debug("  KW stats: %s", json.dumps({"cats": KW_STATS["cats"], "keywords": dict(KW_STATS["keywords"].most_common(50))}))
+
+def classify(text):
+    """(KW categories, business categories) for text; cached per normalized string."""
+    return _classify(" ".join(text.lower().split()))
+
+def cats(text): return list(classify(text)[0])
 
 def biz_cats(text):
     """Return list of business categories (GMG/ENT/PPM/MTU) for given text."""
-    kw_cats = cats(text)
-    biz = list(dict.fromkeys(BIZ_CATS.get(c, "GMG") for c in kw_cats))
-    return biz if biz else ["GMG"]
-
-def recent(ds, days=7):
-    if not ds: return False
-    cut = NOW - timedelta(days=days)
-    for f in ['%a, %d %b %Y %H:%M:%S %z','%a, %d %b %Y %H:%M:%S %Z',
+    return list(classify(text)[1])
+
+_DATE_FMTS = ['%a, %d %b %Y %H:%M:%S %z','%a, %d %b %Y %H:%M:%S %Z',
               '%Y-%m-%dT%H:%M:%S%z','%Y-%m-%dT%H:%M:%SZ',
-              '%Y-%m-%dT%H:%M:%S.%f%z','%Y-%m-%d %H:%M:%S','%Y-%m-%d']:
-        try:
-            p = datetime.strptime(ds.replace('GMT','+0000'),f)
-            if p.tzinfo: p = p.replace(tzinfo=None)
-            return p >= cut
+              '%Y-%m-%dT%H:%M:%S.%f%z','%Y-%m-%d %H:%M:%S','%Y-%m-%d']
+_DATE_FMT_BY_SRC = {}      # source -> last strptime format that worked for it
+DATE_FAILS = Counter()     # source -> dates we could not parse this run
+_DATE_LOCK = _threading.Lock()
+
+def _utc(p):
+    """Aware UTC datetime; naive values (formats without an offset) are taken to be UTC already."""
+    return p.astimezone(timezone.utc) if p.tzinfo else p.replace(tzinfo=timezone.utc)
+
+def _parse_date(ds, source=None):
+    """Parse a feed/API date string to an aware UTC datetime, or None.
+    ISO-8601 goes through fromisoformat; otherwise the format that last worked for source is tried first."""
+    if not ds: return None
+    ds = ds.strip()
+    if len(ds) >= 10 and ds[4:5] == "-" and ds[:4].isdigit():
+        try: return _utc(datetime.fromisoformat(ds.replace("Z", "+00:00")))
+        except ValueError: pass
+    hit = _DATE_FMT_BY_SRC.get(source)
+    norm = ds.replace('GMT','+0000')
+    for f in ([hit] + [f for f in _DATE_FMTS if f != hit]) if hit else _DATE_FMTS:
+        try: p = datetime.strptime(norm, f)
         except (ValueError, TypeError): continue
-    return False
+        if source: _DATE_FMT_BY_SRC[source] = f
+        return _utc(p)
+    if source:
+        with _DATE_LOCK: DATE_FAILS[source] += 1
+    return None
 
-def mass_appeal(t):
-    lo = t.lower()
-    return not any(x in lo for x in
-        ["my ","i ","i'm","i've","me ","just got","finally",
-         "my friend","helped me","unpopular opinion","does anyone",
-         "question about","need help","eli5","ama"])
+def entry_date(e, source=None):
+    """Date of a feed entry: feedparser's pre-parsed UTC struct if present, else the raw string."""
+    for k in ("published_parsed", "updated_parsed"):
+        st = e.get(k)
+        if st: return datetime(*st[:6], tzinfo=timezone.utc)
+    return _parse_date(e.get("published") or e.get("updated") or "", source)
+
+def log_date_stats():
+    if DATE_FAILS:
+        log.info("  Unparseable dates: " + ", ".join(f"{src} {n}" for src, n in DATE_FAILS.most_common()))
+
+def mass_appeal(t): return norm_title(t).appeal
 
 def norm(v, mx): return min(100.0, v/mx*100.0) if mx > 0 else 0.0
 def esc(s): return _html.escape(str(s))
@@ -520,23 +1009,187 @@ def _fmt_action(a):
         return "".join(parts)
     return esc(str(a))
 
+class CandidateIndex:
+    """Title -> best-matching candidate, shared by every output builder after comp_score.
+
+    Gives the same answer as a full SequenceMatcher scan (best ratio > 0.45, earliest candidate on
+    ties) but each candidate's title is normalized and analysed once, candidates sharing a word
+    with the query are tried first, length/character-count upper bounds skip the rest, and
+    results are memoized per normalized title. The per-candidate matchers are stateful
+    (set_seq1), so lookups are serialized by a lock; output builders may run on threads."""
+    MIN_RATIO = 0.45
+
+    def __init__(self, cands):
+        self.cands = cands; self.n = len(cands); self.memo = {}; self._lock = _threading.Lock()
+        self.sms = []; self.post = defaultdict(list)
+        for i, c in enumerate(cands):
+            b = _NON_ALNUM_SP.sub('', c.title.lower())
+            sm = SequenceMatcher(None, "", b) if b else None   # b2j/char counts for the title computed once
+            self.sms.append(sm)
+            for w in set(b.split()): self.post[w].append(i)
+
+    def match(self, title):
+        a = _NON_ALNUM_SP.sub('', title.lower())
+        with self._lock:
+            if a not in self.memo: self.memo[a] = self._best(a) if a else None
+            return self.memo[a]
+
+    def _best(self, a):
+        near = sorted({i for w in set(a.split()) for i in self.post.get(w, ())})
+        seen = set(near); best = None; best_r = self.MIN_RATIO
+        for i in near + [i for i in range(self.n) if i not in seen]:
+            sm = self.sms[i]
+            if sm is None: continue
+            sm.set_seq1(a)
+            if sm.real_quick_ratio() < best_r or sm.quick_ratio() < best_r: continue
+            r = sm.ratio()
+            if r > best_r or (r == best_r and best is not None and i < best):
+                best_r = r; best = i
+        return self.cands[best] if best is not None else None
+
+_CAND_INDEX = None
+_CAND_INDEX_LOCK = _threading.Lock()
+
+def _cand_index(cands):
+    """The CandidateIndex for this candidate list. Code that reorders or edits a list in place
+    calls invalidate_cand_index; a different list object always gets a new index."""
+    global _CAND_INDEX
+    with _CAND_INDEX_LOCK:
+        if _CAND_INDEX is None or _CAND_INDEX.cands is not cands or _CAND_INDEX.n != len(cands):
+            _CAND_INDEX = CandidateIndex(cands)
+        return _CAND_INDEX
+
+def invalidate_cand_index(cands=None):
+    """Drop the cached CandidateIndex (only if it was built for cands, when given)."""
+    global _CAND_INDEX
+    with _CAND_INDEX_LOCK:
+        if cands is None or (_CAND_INDEX is not None and _CAND_INDEX.cands is cands): _CAND_INDEX = None
+
 def _match_cand(title, cands):
     """Find BEST matching candidate (not first-above-threshold). Prevents wrong URL matches."""
-    best = None; best_r = 0
-    a = re.sub(r'[^a-z0-9 ]','',title.lower())
-    if not a: return None
-    for c in cands:
-        b = re.sub(r'[^a-z0-9 ]','',c.title.lower())
-        if not b: continue
-        r = SequenceMatcher(None,a,b).ratio()
-        if r > best_r: best_r = r; best = c
-    return best if best_r > 0.45 else None
+    return _cand_index(cands).match(title)
 
 def _domain(url):
     if not url: return ""
     try: return urlparse(url).netloc.replace("www.","")[:30]
     except Exception: return ""
 
+_TRACKING_PARAM = re.compile(r"utm_.*|ref|ref_?src|ref_?url|referrer|fbclid|gclid|dclid|msclkid|mc_[ce]id|igshid|"
+                             r"cmpid|ocid|smid|ncid|guccounter|_ga|_gl|sr_share|share|si|feature", re.I)
+# Redirect wrappers: (host suffix, path prefix) -> query param holding the target ("" = the raw query)
+_REDIRECTORS = {("google.com", "/url"): "q", ("l.facebook.com", "/l.php"): "u", ("lm.facebook.com", "/l.php"): "u",
+                ("l.instagram.com", "/"): "u", ("out.reddit.com", "/"): "url", ("youtube.com", "/redirect"): "q",
+                ("duckduckgo.com", "/l/"): "uddg", ("t.umblr.com", "/redirect"): "z", ("href.li", "/"): ""}
+
+def _unwrap_redirect(p):
+    """Target URL of a known redirect wrapper, or None."""
+    host = p.netloc.lower()
+    for (suffix, path), param in _REDIRECTORS.items():
+        if (host == suffix or host.endswith("." + suffix)) and p.path.startswith(path):
+            target = p.query if not param else dict(parse_qsl(p.query)).get(param, "")
+            if target.startswith(("http://", "https://")): return target
+    return None
+
+def _canon_url(url):
+    """Canonical form of a URL for identity checks: redirect wrappers unwrapped; no scheme, www/m/amp
+    host prefix, default port, fragment, tracking params, trailing slash or /amp; sorted query."""
+    if not url: return ""
+    url = url.strip()
+    try:
+        for _ in range(3):
+            p = urlparse(url); target = _unwrap_redirect(p)
+            if not target: break
+            url = target
+    except Exception: return url.lower()
+    host = p.netloc.lower().rsplit("@", 1)[-1]
+    if host.endswith((":80", ":443")): host = host.rsplit(":", 1)[0]
+    for pre in ("www.", "m.", "amp."):
+        if host.startswith(pre): host = host[len(pre):]; break
+    path = re.sub(r"/{2,}", "/", p.path).rstrip("/")
+    if path.endswith("/amp"): path = path[:-4]
+    q = urlencode(sorted((k,v) for k,v in parse_qsl(p.query, keep_blank_values=True) if not _TRACKING_PARAM.fullmatch(k)))
+    return f"{host}{path}" + (f"?{q}" if q else "")
+
+SEEN_INDEX_FILE = os.environ.get("SEEN_INDEX_FILE", "seen_index.json")
+SEEN_TTL_DAYS = 21   # forget items not seen for this long
+
+def _kw_fingerprint():
+    """Hash of everything a cached classification depends on (KW, matcher mode, appeal filter)."""
+    return hashlib.sha1(json.dumps([KW, KW_WORD_BOUNDARY, _NOT_MASS_APPEAL.pattern], sort_keys=True).encode()).hexdigest()[:16]
+RUN_TS = int(NOW.timestamp())
+
+class SeenIndex:
+    """Persistent cross-run index of feed items, keyed by canonical URL (or title) hash.
+
+    Each entry is [first_seen, last_seen, published, cats] (epoch seconds; cats is the
+    stored classification or None for items that were rejected), so known items skip
+    date parsing and keyword matching on later runs. The index records a fingerprint of KW
+    and the appeal filter; when it no longer matches, stored classifications are dropped
+    (items are re-classified when next seen, keeping their first-seen time)."""
+    def __init__(self, path=SEEN_INDEX_FILE, ttl_days=SEEN_TTL_DAYS):
+        self.path = path; self.ttl = ttl_days * 86400; self.kw = _kw_fingerprint()
+        self._items = None; self._stale = {}; self._lock = _threading.Lock()
+        self.hits = 0; self.added = 0
+
+    def _load(self):
+        if self._items is not None: return self._items
+        self._items = {}
+        try:
+            with open(self.path) as f: data = json.load(f)
+            self._items = data.get("items", {})
+            if data.get("kw") != self.kw:
+                log.info(f"  Seen index: keywords changed, re-classifying {len(self._items)} known items")
+                self._stale = self._items; self._items = {}
+            log.debug(f"Seen index: loaded {len(self._items)} items from {self.path}")
+        except FileNotFoundError: pass
+        except Exception as e: log.warning(f"Seen index {self.path} unreadable, starting fresh: {e}")
+        return self._items
+
+    @staticmethod
+    def key(url="", title=""):
+        ident = _canon_url(url) or norm_title(title).key
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, key):
+        with self._lock:
+            ent = self._load().get(key)
+            if ent is not None: ent[1] = RUN_TS; self.hits += 1
+            return ent
+
+    def add(self, key, cats, published=None):
+        """Record a newly parsed item. Returns its entry."""
+        pub = int(published.timestamp()) if published else 0
+        with self._lock:
+            items = self._load(); ent = items.get(key)
+            if ent is None:
+                old = self._stale.pop(key, None)
+                ent = items[key] = [old[0] if old else RUN_TS, RUN_TS, pub or (old[2] if old else 0), cats]
+                self.added += old is None
+            return ent
+
+    @staticmethod
+    def is_recent(ent, days):
+        return not ent[2] or ent[2] >= RUN_TS - days * 86400
+
+    @staticmethod
+    def stamp(meta, ent):
+        """Tag a signal's meta with new-since-last-run and age (hours since published, else first seen)."""
+        meta["new"] = ent[0] >= RUN_TS
+        meta["age_h"] = round((RUN_TS - (ent[2] or ent[0])) / 3600, 1)
+        return meta
+
+    def save(self):
+        with self._lock:
+            if self._items is None: return
+            cut = RUN_TS - self.ttl
+            self._items = {k:v for k,v in self._items.items() if v[1] >= cut}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f: json.dump({"v":1, "kw":self.kw, "items":self._items}, f, separators=(",",":"))
+            os.replace(tmp, self.path)
+        log.info(f"  Seen index saved: {len(self._items)} items ({self.added} new this run, {self.hits} skipped reparsing)")
+
+SEEN = SeenIndex()
+
 # =============================================================================
 # SECTION 4 - 16 DATA FETCHERS
 # =============================================================================
@@ -578,27 +1231,28 @@ class TrendsFetcher:
 
 class RedditFetcher:
     def fetch(self):
-        out = []
+        out = SignalTable()
         log.info(f"I'm browsing {len(SUBREDDITS)} gaming subreddits to see what people are discussing...")
         subs_with_results = set()
         for sub in SUBREDDITS:
             try:
-                feed = feedparser.parse(f"https://www.reddit.com/r/{sub}/hot/.rss?limit=8",
-                    request_headers={"User-Agent":"RechargeScanner/4.2"})
+                feed = fetch_feed(f"https://www.reddit.com/r/{sub}/hot/.rss?limit=8",
+                    headers={"User-Agent":"RechargeScanner/4.2"})
                 for e in feed.entries[:5]:
-                    t = e.get("title","")
-                    if not mass_appeal(t): continue
-                    cc = cats(t)
+                    t = e.get("title",""); sk = SEEN.key(e.get("link",""), t)
+                    ent = SEEN.get(sk)
+                    if ent is None:
+                        ent = SEEN.add(sk, cats(t) if mass_appeal(t) else None)
+                    cc = ent[3]
                     if not cc: continue
-                    out.append(Signal("reddit",t[:150],f"r/{sub} (Hot)",
-                        url=e.get("link",""),score=65,meta={"sub":sub,"cats":cc}))
+                    out.add("reddit",t[:150],f"r/{sub} (Hot)",e.get("link",""),65,SEEN.stamp({"sub":sub,"cats":cc}, ent))
                     subs_with_results.add(sub)
                 time.sleep(2)
             except Exception as e:
                 log.warning(f"Reddit r/{sub}: {e}"); continue
-        top = sorted(out, key=lambda s: s.score, reverse=True)[:3]
+        top = sorted(out.rows(), key=lambda s: s.score, reverse=True)[:3]
         top_titles = ', '.join(s.title[:50] for s in top) if top else "nothing notable"
-        log.info(f"Found {len(out)} posts across {len(subs_with_results)} subreddits. Hot topics: {top_titles}")
+        log.info(f"Found {out.n} posts across {len(subs_with_results)} subreddits. Hot topics: {top_titles}")
         return out
 
 class SteamFetcher:
@@ -660,71 +1314,84 @@ class WikiFetcher:
 
 class YTFetcher:
     def fetch(self):
-        out = []; ns = {"a":"http://www.w3.org/2005/Atom"}
+        out = SignalTable()
         log.info(f"I'm checking {len(YT_CHANNELS)} YouTube gaming channels for new videos...")
         for ch,cid in YT_CHANNELS.items():
             try:
-                r = GET(f"https://www.youtube.com/feeds/videos.xml?channel_id={cid}",timeout=10)
-                if not r: continue
-                root = ET.fromstring(r.content)
-                for e in root.findall("a:entry",ns)[:10]:
-                    te = e.find("a:title",ns); le = e.find("a:link",ns); pe = e.find("a:published",ns)
-                    if te is None: continue
-                    t = te.text or ""; u = le.get("href","") if le is not None else ""
-                    pub = pe.text if pe is not None else ""
-                    if not recent(pub,7): continue
-                    cc = cats(t)
-                    if cc: out.append(Signal("youtube",t[:150],f"YouTube: {ch}",url=u,score=60,meta={"ch":ch,"cats":cc}))
+                feed = fetch_feed(f"https://www.youtube.com/feeds/videos.xml?channel_id={cid}",timeout=10)
+                for e in feed.entries[:10]:
+                    t = e.get("title",""); u = e.get("link","")
+                    sk = SEEN.key(u, t); ent = SEEN.get(sk)
+                    if ent is None:
+                        pd = entry_date(e, "YouTube")
+                        if pd is None: continue
+                        ent = SEEN.add(sk, cats(t), pd)
+                    if not SEEN.is_recent(ent, 7): continue
+                    cc = ent[3]
+                    if cc: out.add("youtube",t[:150],f"YouTube: {ch}",u,60,SEEN.stamp({"ch":ch,"cats":cc}, ent))
             except Exception as e:
                 log.warning(f"YouTube {ch}: {e}"); continue
-        top = out[:3]
-        top_titles = ', '.join(s.title[:45] for s in top) if top else "nothing recent"
-        log.info(f"Found {len(out)} videos. Latest: {top_titles}")
+        top_titles = ', '.join(t[:45] for t in out.title[:3]) if out.n else "nothing recent"
+        log.info(f"Found {out.n} videos. Latest: {top_titles}")
         return out
 
 class NewsFetcher:
     def fetch(self):
-        out = []; seen = set()
+        out = SignalTable(); seen = set()
         log.info(f"I'm scanning {len(RSS_FEEDS)} news sites (IGN, GameSpot, PYMNTS, etc.) for headlines...")
         # Skip Google News RSS if Oxylabs handles it (avoids massive overlap)
         skip_gnews = bool(OXYLABS_USER and OXYLABS_PASS)
-        for topic in ([] if skip_gnews else NEWS_TOPICS):
-            try:
-                feed = feedparser.parse(f"https://news.google.com/rss/search?q={quote(topic)}+when:7d&hl=en-US&gl=US&ceid=US:en")
-                for e in feed.entries[:3]:
-                    t = e.get("title",""); src = "News"
-                    if " - " in t: t,src = t.rsplit(" - ",1)
-                    k = re.sub(r'[^a-z0-9]','',t[:80].lower())
-                    if k in seen: continue
-                    seen.add(k)
-                    if not mass_appeal(t) or not recent(e.get("published",""),7): continue
-                    cc = cats(t)
-                    if cc: out.append(Signal("news",t[:150],f"via {src}",url=e.get("link",""),score=70,meta={"src":src,"cats":cc}))
-                time.sleep(0.15)
-            except Exception as e:
-                log.debug(f"News topic '{topic[:30]}': {e}"); continue
+        jobs = [] if skip_gnews else [(mk, gnews_url(topic, mk)) for topic in NEWS_TOPICS for mk in SCAN_MARKETS]
+        entries = fetch_feeds([u for _,u in jobs]) if jobs else {}
+        by_key = {}; rows = []   # markets are tagged until the loop ends, so rows are added after it
+        for mk, u in jobs:
+            for e in entries.get(u, [])[:3]:
+                t = e.get("title",""); src = "News"
+                if " - " in t: t,src = t.rsplit(" - ",1)
+                k = norm_title(t).key
+                if k in by_key: _tag_market(by_key[k], mk); continue
+                if k in seen: continue
+                seen.add(k)
+                ent = self._lookup(e, t, "Google News")
+                if not ent: continue
+                cc = ent[3]
+                if cc:
+                    by_key[k] = _tag_market(SEEN.stamp({"src":src,"cats":cc}, ent), mk)
+                    rows.append((t[:150],f"via {src}",e.get("link",""),70,by_key[k]))
+        for r in rows: out.add("news", *r)
         for fn,fu in RSS_FEEDS.items():
             try:
-                feed = feedparser.parse(fu)
+                feed = fetch_feed(fu)
                 for e in feed.entries[:20]:
                     t = e.get("title","")
-                    k = re.sub(r'[^a-z0-9]','',t[:80].lower())
+                    k = norm_title(t).key
                     if k in seen: continue
                     seen.add(k)
-                    if not mass_appeal(t) or not recent(e.get("published",e.get("updated","")),7): continue
-                    cc = cats(t)
+                    ent = self._lookup(e, t, fn)
+                    if not ent: continue
+                    cc = ent[3]
                     if cc:
-                        out.append(Signal("news",t[:150],f"via {fn}",url=e.get("link",""),score=65,meta={"src":fn,"cats":cc}))
+                        out.add("news",t[:150],f"via {fn}",e.get("link",""),65,SEEN.stamp({"src":fn,"cats":cc}, ent))
                     elif fn in ("IGN","GameSpot","Kotaku","PC Gamer","Eurogamer","Polygon","GamesRadar","Dexerto","VG247","DualShockers","GameRant","GamesIndustry.biz","Screen Rant","PYMNTS","What's On Netflix","VGC","PCGamesN","Collider","Deadline TV","CinemaBlend","ComingSoon","Digital Spy"):
-                        out.append(Signal("news",t[:150],f"via {fn}",url=e.get("link",""),score=45,meta={"src":fn,"cats":["General"]}))
+                        out.add("news",t[:150],f"via {fn}",e.get("link",""),45,SEEN.stamp({"src":fn,"cats":["General"]}, ent))
                 time.sleep(0.05)
             except Exception as e:
                 log.debug(f"News RSS {fn}: {e}"); continue
-        top = sorted(out, key=lambda s: s.score, reverse=True)[:3]
+        top = sorted(out.rows(), key=lambda s: s.score, reverse=True)[:3]
         top_titles = ', '.join(s.title[:45] for s in top) if top else "none"
-        log.info(f"Collected {len(out)} articles. Headlines: {top_titles}")
+        log.info(f"Collected {out.n} articles. Headlines: {top_titles}")
         return out
 
+    @staticmethod
+    def _lookup(e, t, src, days=7):
+        """Seen-index entry for a feed item if it passes the appeal/recency filters, else None."""
+        sk = SEEN.key(e.get("link",""), t); ent = SEEN.get(sk)
+        if ent is None:
+            pd = entry_date(e, src) if mass_appeal(t) else None
+            ent = SEEN.add(sk, cats(t) if pd else None, pd)
+        if ent[3] is None or not SEEN.is_recent(ent, days): return None
+        return ent
+
 class OxylabsNewsFetcher:
     """Fresh real-time news via Oxylabs Web Scraper API (Google News)."""
     # Focused queries per business category for maximum fresh coverage
@@ -774,7 +1441,7 @@ class OxylabsNewsFetcher:
     def fetch(self):
         if not OXYLABS_USER or not OXYLABS_PASS:
             log.info("I wanted to search Google News via Oxylabs but credentials aren't set. Skipping."); return []
-        out = []; seen = set()
+        out = SignalTable(); seen = set()
         # Flatten and deduplicate queries, prioritize GMG/ENT (more results expected)
         all_queries = []
         for bc in ["GMG","ENT","PPM","MTU"]:
@@ -783,59 +1450,49 @@ class OxylabsNewsFetcher:
         # Add product-specific queries (from Recharge.com top products)
         for pq, pbc in self.PRODUCT_QUERIES:
             all_queries.append((pq + " news", pbc))
-        log.info(f"Now searching Google News for {len(all_queries)} queries across Gaming, Entertainment, Payments, Mobile...")
-        for idx, (query, bc) in enumerate(all_queries, 1):
-            if idx % 15 == 0:
-                log.info(f"  ...{idx}/{len(all_queries)} done, found {len(out)} articles so far")
-            try:
-                payload = {
-                    "source": "google_search",
-                    "query": query,
-                    "parse": True,
-                    "context": [
-                        {"key": "tbm", "value": "nws"},
-                        {"key": "tbs", "value": "qdr:d"},  # last 24 hours
-                    ],
-                    "geo_location": "United States",
-                    "locale": "en-US",
-                    "limit": 10,
-                }
-                r = requests.post("https://realtime.oxylabs.io/v1/queries",
-                    auth=(OXYLABS_USER, OXYLABS_PASS), json=payload, timeout=30)
-                if r.status_code != 200: continue
-                data = r.json()
-                results = data.get("results", [])
-                if not results: continue
-                content = results[0].get("content", {})
-                if not isinstance(content, dict): continue
-                main_items = content.get("results", {}).get("main", [])
-                for item in main_items[:8]:
-                    title = item.get("title", "").strip()
-                    if not title: continue
-                    k = re.sub(r'[^a-z0-9]','', title[:80].lower())
-                    if k in seen: continue
-                    seen.add(k)
-                    if not mass_appeal(title): continue
-                    url = item.get("url", "")
-                    source = item.get("source", "Google News")
-                    age = item.get("relative_publish_date", "")
-                    cc = cats(title)
-                    # Higher score for very fresh news (hours ago)
-                    score = 80  # base: higher than RSS news (70)
-                    if "minute" in age.lower(): score = 90
-                    elif "hour" in age.lower():
-                        try:
-                            hrs = int(re.search(r'(\d+)', age).group(1))
-                            score = 90 if hrs <= 3 else 85
-                        except: score = 85
-                    out.append(Signal("oxylabs_news", title[:150],
-                        f"via {source} ({age})", url=url, score=score,
-                        meta={"src": source, "age": age, "cats": cc if cc else [query.split()[0]],
-                              "biz_cat": bc, "fresh": True}))
-                time.sleep(0.3)  # rate limit
-            except Exception as e:
-                log.warning(f"OxylabsNews query '{query}': {e}"); continue
-        log.info(f"Google News search done. Found {len(out)} fresh articles."); return out
+        jobs = [(q, bc, mk) for q, bc in all_queries for mk in SCAN_MARKETS]
+        log.info(f"Now searching Google News for {len(all_queries)} queries across Gaming, Entertainment, Payments, Mobile"
+                 f" in {len(SCAN_MARKETS)} market(s): {', '.join(SCAN_MARKETS)}...")
+        results = {}
+        with ThreadPoolExecutor(max_workers=OXYLABS_WORKERS) as pool:
+            futs = {pool.submit(oxylabs_news, q, mk, "qdr:d", 10): (q, mk) for q, _, mk in jobs}  # last 24 hours
+            for idx, fut in enumerate(as_completed(futs), 1):
+                if idx % 15 == 0:
+                    log.info(f"  ...{idx}/{len(jobs)} done")
+                try: results[futs[fut]] = fut.result()
+                except Exception as e:
+                    log.warning(f"OxylabsNews query '{futs[fut][0]}' ({futs[fut][1]}): {e}"); results[futs[fut]] = []
+        # Fold in query order so the output is deterministic; identical stories across markets merge into one signal
+        by_key = {}; rows = []
+        for query, bc, mk in jobs:
+            for item in results.get((query, mk), [])[:8]:
+                title = item.get("title", "").strip()
+                if not title: continue
+                k = norm_title(title).key
+                if k in by_key: _tag_market(by_key[k], mk); continue
+                if k in seen: continue
+                seen.add(k)
+                url = item.get("url", "")
+                sk = SEEN.key(url, title); ent = SEEN.get(sk)
+                if ent is None:
+                    ent = SEEN.add(sk, cats(title) if mass_appeal(title) else None)
+                if ent[3] is None: continue
+                source = item.get("source", "Google News")
+                age = item.get("relative_publish_date", "")
+                cc = ent[3]
+                # Higher score for very fresh news (hours ago)
+                score = 80  # base: higher than RSS news (70)
+                if "minute" in age.lower(): score = 90
+                elif "hour" in age.lower():
+                    try:
+                        hrs = int(re.search(r'(\d+)', age).group(1))
+                        score = 90 if hrs <= 3 else 85
+                    except: score = 85
+                by_key[k] = _tag_market(SEEN.stamp({"src": source, "age": age, "cats": cc if cc else [query.split()[0]],
+                                                    "biz_cat": bc, "fresh": True}, ent), mk)
+                rows.append((title[:150], f"via {source} ({age})", url, score, by_key[k]))
+        for r in rows: out.add("oxylabs_news", *r)
+        log.info(f"Google News search done. Found {out.n} fresh articles."); return out
 
 class CompetitorFetcher:
     DEAL_PATHS = ["/deals","/promotions","/sale","/hot-deals","/best-deals"]
@@ -848,14 +1505,11 @@ class CompetitorFetcher:
                 # Homepage scan
                 r = GET(url,headers=hd,timeout=12)
                 if not r: continue
-                soup = BeautifulSoup(r.text,"html.parser")
-                text = soup.get_text(" ",strip=True)[:5000]; promo = []
-                for cat,kws in KW.items():
-                    if any(k.lower() in text.lower() for k in kws) and cat not in promo: promo.append(cat)
+                page = parse_offload(_extract_page, r.text, kind="competitor")
+                text = page["text"]; promo = cats(text)
                 # Extract headline promotions
                 hero_texts = []
-                for tag in soup.find_all(["h1","h2","h3","title"]):
-                    tag_text = tag.get_text(strip=True)
+                for tag_text in page["headings"]:
                     if tag_text and len(tag_text) > 5:
                         hero_texts.append(tag_text[:100])
                     for c in cats(tag_text):
@@ -875,9 +1529,7 @@ class CompetitorFetcher:
                     try:
                         r2 = GET(domain + path, headers=hd, timeout=8)
                         if not r2 or r2.status_code != 200: continue
-                        soup2 = BeautifulSoup(r2.text, "html.parser")
-                        for tag in soup2.find_all(["h1","h2","h3"])[:10]:
-                            tag_text = tag.get_text(strip=True)
+                        for tag_text in parse_offload(_extract_headings, r2.text, 10, kind="deals"):
                             cc = cats(tag_text)
                             if cc:
                                 for c in cc:
@@ -1133,10 +1785,7 @@ class SitemapFetcher:
             try:
                 r = GET(f"{scheme}://{domain}{blog_path}", timeout=8)
                 if not r: continue
-                soup = BeautifulSoup(r.text, "html.parser")
-                for link in soup.find_all("link", rel="alternate"):
-                    href = link.get("href","")
-                    lt = link.get("type","")
+                for href, lt in parse_offload(_extract_feed_links, r.text, kind="blog"):
                     if href and ("rss" in lt or "atom" in lt or "xml" in lt):
                         if href.startswith("/"): href = f"{scheme}://{domain}{href}"
                         if href not in rss_urls: rss_urls.insert(0, href)
@@ -1146,26 +1795,23 @@ class SitemapFetcher:
 
         for rss_url in rss_urls:
             try:
-                feed = feedparser.parse(rss_url)
+                feed = fetch_feed(rss_url, timeout=10)
                 if not feed.entries: continue
                 for e in feed.entries[:15]:
                     title = e.get("title","").strip()
                     link = e.get("link","")
-                    pub = e.get("published", e.get("updated",""))
                     if not title: continue
-                    if not recent(pub, 14): continue
-                    pub_short = pub[:10] if pub else DATE
-                    # Try to get a clean date
-                    for fmt in ['%a, %d %b %Y %H:%M:%S %z','%Y-%m-%dT%H:%M:%S%z','%Y-%m-%d']:
-                        try:
-                            pub_short = datetime.strptime(pub.replace('GMT','+0000'),fmt).strftime("%Y-%m-%d")
-                            break
-                        except (ValueError, TypeError): continue
+                    sk = SEEN.key(link, title); ent = SEEN.get(sk)
+                    if ent is None:
+                        pd = entry_date(e, f"blog:{name}")
+                        ent = SEEN.add(sk, cats(title) if pd else None, pd)
+                    if ent[3] is None or not SEEN.is_recent(ent, 14): continue
+                    pub_short = datetime.fromtimestamp(ent[2]).strftime("%Y-%m-%d") if ent[2] else DATE
                     out.append(Signal("sitemap", f"{name}: {title[:80]}",
                         f"Blog post on {name} ({pub_short})",
                         url=link, score=50,
-                        meta={"comp":name,"lastmod":pub_short,"type":"blog","cats":cats(title),
-                              "biz_cat":biz_cats(title)[0],"activity_type":"blog_post"}))
+                        meta=SEEN.stamp({"comp":name,"lastmod":pub_short,"type":"blog","cats":ent[3],
+                              "biz_cat":biz_cats(title)[0],"activity_type":"blog_post"}, ent)))
                     found_any = True
                 if found_any:
                     log.info(f"Blog RSS {name}: found posts")
@@ -1181,35 +1827,11 @@ class SitemapFetcher:
             try:
                 r = GET(f"{scheme}://{domain}{blog_path}", timeout=10)
                 if not r or r.status_code != 200: continue
-                soup = BeautifulSoup(r.text, "html.parser")
-                # Look for article-like elements
-                articles = soup.find_all(["article","div"],
-                    class_=re.compile(r"post|article|blog|card|entry", re.I))
-                if not articles:
-                    # Fallback: just find all links that look like blog posts
-                    articles = soup.find_all("a", href=re.compile(r"/blog/|/post/|/article/|/news/|/hub/"))
                 found = 0
-                for art in articles[:25]:
-                    # Get title
-                    h = art.find(["h1","h2","h3","h4"])
-                    if h:
-                        title = h.get_text(strip=True)
-                    elif art.name == "a":
-                        title = art.get_text(strip=True)
-                    else:
-                        continue
-                    if not title or len(title) < 10: continue
-                    # Get link
-                    link_el = art.find("a", href=True) if art.name != "a" else art
-                    href = link_el.get("href","") if link_el else ""
+                for title, href, date_str in parse_offload(_extract_blog_articles, r.text, kind="blog"):
                     if href.startswith("/"): href = f"{scheme}://{domain}{href}"
-                    # Get date if available
-                    time_el = art.find("time")
-                    date_str = time_el.get("datetime","")[:10] if time_el else ""
-                    if date_str:
-                        try:
-                            if datetime.strptime(date_str, "%Y-%m-%d") < cutoff: continue
-                        except ValueError: pass
+                    pd = _parse_date(date_str, f"blog:{name}")
+                    if pd and pd < cutoff.astimezone(timezone.utc): continue
                     out.append(Signal("sitemap", f"{name}: {title[:80]}",
                         f"Blog page on {name}" + (f" ({date_str})" if date_str else ""),
                         url=href, score=45,
@@ -1251,20 +1873,16 @@ class SitemapFetcher:
             try:
                 r = GET(sm_url, timeout=10)
                 if not r: continue
-                root = ET.fromstring(r.content)
-                ns = {"s":"http://www.sitemaps.org/schemas/sitemap/0.9"}
-                sitemaps = root.findall("s:sitemap", ns)
+                sitemaps, urls = parse_offload(_extract_sitemap, r.content, cutoff, kind="sitemap")
                 if sitemaps:
-                    for sm in sitemaps[:5]:
-                        loc = sm.find("s:loc", ns)
-                        if loc is not None and loc.text:
-                            try:
-                                r2 = GET(loc.text.strip(), timeout=10)
-                                if r2: found_urls.extend(self._parse_urlset(r2.content, ns, cutoff))
-                            except Exception as e:
-                                log.debug(f"Sitemap sub {name}: {e}"); continue
+                    for loc in sitemaps[:5]:
+                        try:
+                            r2 = GET(loc, timeout=10)
+                            if r2: found_urls.extend(parse_offload(_extract_sitemap, r2.content, cutoff, kind="sitemap")[1])
+                        except Exception as e:
+                            log.debug(f"Sitemap sub {name}: {e}"); continue
                 else:
-                    found_urls.extend(self._parse_urlset(r.content, ns, cutoff))
+                    found_urls.extend(urls)
                 if found_urls: break
             except Exception as e:
                 log.debug(f"Sitemap XML {name}: {e}"); continue
@@ -1293,43 +1911,225 @@ class SitemapFetcher:
                 meta={"comp":name,"lastmod":lastmod,"type":"page","cats":cats(page_title),
                       "biz_cat":biz_cats(page_title)[0],"activity_type":act_type}))
 
-    def _parse_urlset(self, content, ns, cutoff):
-        results = []
-        try:
-            root = ET.fromstring(content)
-            for url_el in root.findall("s:url", ns):
-                loc = url_el.find("s:loc", ns)
-                mod = url_el.find("s:lastmod", ns)
-                if loc is None: continue
-                loc_text = loc.text.strip() if loc.text else ""
-                if mod is None: continue
-                mod_text = mod.text.strip()[:10] if mod.text else ""
-                try:
-                    mod_date = datetime.strptime(mod_text, "%Y-%m-%d")
-                    if mod_date >= cutoff:
-                        results.append((loc_text, mod_text))
-                except ValueError: continue
-        except Exception as e: log.debug(f"Sitemap parse: {e}")
-        return results
-
 # =============================================================================
 # SECTION 4B - HISTORY & TRENDS (week-over-week comparison)
 # =============================================================================
 
-def load_previous_history():
-    """Load the most recent history JSON file for week-over-week comparison."""
-    import glob as _glob
-    history_files = sorted(_glob.glob("history_*.json"), reverse=True)
-    for hf in history_files:
-        try:
-            date_str = hf.replace("history_", "").replace(".json", "")
-            if date_str == DATE: continue
-            with open(hf) as f: return json.load(f)
-        except Exception as e: log.debug(f"Failed to load {hf}: {e}")
-    return None
+HISTORY_DB = os.environ.get("HISTORY_DB", "history.db")
+TS_BASELINE_WEEKS = int(os.environ.get("TS_BASELINE_WEEKS", "8"))   # weeks of history a spike is measured against
+TS_SPIKE_Z = float(os.environ.get("TS_SPIKE_Z", "3"))               # z-score that counts as a spike
+TS_MIN_WEEKS = int(os.environ.get("TS_MIN_WEEKS", "4"))             # baseline weeks needed before flagging spikes
+TS_MIN_COUNT = int(os.environ.get("TS_MIN_COUNT", "5"))             # ignore series with fewer signals this week
+TS_SLOPE_WEEKS = 4                                                  # window of the rolling average and slope
+HISTORY_TEXT_WEEKS = int(os.environ.get("HISTORY_TEXT_WEEKS", "12"))  # signal titles/urls kept this many weeks (0 = forever)
+
+class HistoryStore:
+    """Run history in SQLite: one row per run (unique index on date, so "the run before X" is a
+    single index seek), every candidate of the run, and every signal with its raw and normalized
+    score, its categories and the candidate (rank) it was merged into. A run is written in one
+    transaction. history_*.json files from earlier versions are imported when the store is first opened."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, date TEXT NOT NULL UNIQUE, version TEXT,
+                                         kpis TEXT, markets TEXT, kw_stats TEXT);
+        CREATE TABLE IF NOT EXISTS candidates (run_id INTEGER NOT NULL, rank INTEGER NOT NULL, title TEXT, score REAL,
+                                               sources INTEGER, category TEXT, biz_category TEXT, markets TEXT,
+                                               entity TEXT, members TEXT, picked INTEGER NOT NULL DEFAULT 0,
+                                               PRIMARY KEY (run_id, rank)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS signals (run_id INTEGER NOT NULL, cand INTEGER, source TEXT, title TEXT, url TEXT,
+                                            raw REAL, score REAL, cats TEXT);
+        CREATE INDEX IF NOT EXISTS signals_run ON signals (run_id, cand);
+    """
+    CAND_COLS = "title, score, sources, category, biz_category, markets, entity, members, picked"
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path; self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path); self._db.executescript(self.SCHEMA); self._migrate(); self._import_json()
+        return self._db
+
+    def _migrate(self):
+        """Columns added after a store was created (signals.cats: "|"-joined categories, NULL for older runs)."""
+        if "cats" not in {r[1] for r in self._db.execute("PRAGMA table_info(signals)")}:
+            self._db.execute("ALTER TABLE signals ADD COLUMN cats TEXT")
+
+    def _import_json(self):
+        import glob as _glob
+        have = {d for d, in self._db.execute("SELECT date FROM runs")}
+        for hf in sorted(_glob.glob("history_*.json")):
+            try:
+                with open(hf) as f: h = json.load(f)
+                date = h.get("date") or hf[8:-5]
+                if date in have: continue
+                cands = [c for c in h.get("top_candidates", []) if c.get("title") and isinstance(c.get("score"), (int, float))]
+                self._write(date, h.get("version", ""), h.get("kpis", {}), h.get("markets", []), h.get("kw_stats", {}), cands, [])
+                log.info(f"  History: imported {hf} ({len(cands)} candidates)")
+            except Exception as e: log.debug(f"History import {hf}: {e}")
+
+    def _write(self, date, version, kpis, markets, kw_stats, cands, sigs):
+        """cands: dicts with the candidates columns, in rank order; sigs: (cand rank, source, title, url, raw, score, cats)."""
+        with self._db as db:
+            old = db.execute("SELECT id FROM runs WHERE date = ?", (date,)).fetchone()
+            if old:
+                for table in ("candidates", "signals"): db.execute(f"DELETE FROM {table} WHERE run_id = ?", old)
+                db.execute("DELETE FROM runs WHERE id = ?", old)
+            rid = db.execute("INSERT INTO runs (date, version, kpis, markets, kw_stats) VALUES (?, ?, ?, ?, ?)",
+                             (date, version, json.dumps(kpis), json.dumps(markets), json.dumps(kw_stats))).lastrowid
+            db.executemany(f"INSERT INTO candidates (run_id, rank, {self.CAND_COLS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((rid, k, c["title"], c.get("score"), c.get("sources"), c.get("category"), c.get("biz_category"),
+                             json.dumps(c.get("markets", [])), c.get("entity", ""), json.dumps(c.get("members", [])),
+                             int(bool(c.get("picked")))) for k, c in enumerate(cands)))
+            db.executemany("INSERT INTO signals (run_id, cand, source, title, url, raw, score, cats) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((rid,) + tuple(sg) for sg in sigs))
+        return rid
+
+    def save_run(self, kpis, cands, all_sig, raw, picked=(), date=DATE):
+        """Store this run: KPIs, every candidate (rank = position in cands) and every signal."""
+        home = np.full(all_sig.n, -1, np.int64); picked = set(picked)
+        for k, c in enumerate(cands):
+            for s in c.signals: home[s.i] = k
+        rows = [{"title": c.title, "score": c.score, "sources": c.sources, "category": c.category, "biz_category": c.biz_category,
+                 "markets": c.markets, "entity": c.entity, "members": c.members, "picked": k in picked} for k, c in enumerate(cands)]
+        cat_str = {cs: "|".join(all_sig.cat_names[k] for k in cs) for cs in set(all_sig.cats)}
+        sigs = zip([None if k < 0 else k for k in home.tolist()], [all_sig.src_names[i] for i in all_sig.src.tolist()],
+                   all_sig.title, all_sig.url, np.round(raw, 3).tolist(), all_sig.score.tolist(), [cat_str[cs] for cs in all_sig.cats])
+        kw = {"texts": KW_STATS["texts"], "matched": KW_STATS["matched"], "cats": dict(KW_STATS["cats"])}
+        rid = self._write(date, "5.0", kpis, SCAN_MARKETS, kw, rows, sigs); self.prune_text(date); return rid
+
+    def prune_text(self, before=DATE, weeks=HISTORY_TEXT_WEEKS):
+        """Clear signal titles and urls of runs more than `weeks` weeks before `before`: the store is pushed
+        to the scanner-state branch every week, those columns are most of its size and nothing reads them
+        back (the signal archive keeps the full text). Sources, scores, categories and candidate links stay."""
+        if weeks <= 0: return 0
+        cutoff = (datetime.strptime(before, "%Y-%m-%d") - timedelta(weeks=weeks)).strftime("%Y-%m-%d")
+        with self.db as db:
+            n = db.execute("UPDATE signals SET title = NULL, url = NULL WHERE (title IS NOT NULL OR url IS NOT NULL) "
+                           "AND run_id IN (SELECT id FROM runs WHERE date < ?)", (cutoff,)).rowcount
+        if n: self.db.execute("VACUUM")
+        return n
+
+    def _cands(self, rid, limit=-1):
+        out = []
+        for t, sc, n, cat, bc, mk, ent, mem, pk in self.db.execute(
+                f"SELECT {self.CAND_COLS} FROM candidates WHERE run_id = ? ORDER BY rank LIMIT ?", (rid, limit)):
+            out.append({"title": t, "score": sc, "sources": n, "category": cat, "biz_category": bc, "markets": json.loads(mk or "[]"),
+                        "entity": ent or "", "members": json.loads(mem or "[]"), "picked": bool(pk)})
+        return out
 
-def compute_trends(current_cands, all_sig, previous_history):
-    """Compute week-over-week changes for KPIs and candidate scores."""
+    def previous_run(self, before=DATE):
+        """The latest run dated before `before`, in the old history JSON shape plus every candidate."""
+        row = self.db.execute("SELECT id, date, version, kpis, markets, kw_stats FROM runs WHERE date < ? "
+                              "ORDER BY date DESC LIMIT 1", (before,)).fetchone()
+        if row is None: return None
+        rid, date, version, kpis, markets, kw = row; cands = self._cands(rid)
+        return {"date": date, "version": version, "kpis": json.loads(kpis or "{}"), "markets": json.loads(markets or "[]"),
+                "kw_stats": json.loads(kw or "{}"), "top_candidates": cands[:50], "candidates": cands}
+
+    def scoring_runs(self):
+        """(date, record) per run with stored signals, in the layout _BacktestRun reads."""
+        for rid, date in self.db.execute("SELECT id, date FROM runs ORDER BY date").fetchall():
+            sigs = self.db.execute("SELECT source, raw, cand FROM signals WHERE run_id = ? AND raw IS NOT NULL", (rid,)).fetchall()
+            if not sigs: continue
+            names = list(dict.fromkeys(src for src, _, _ in sigs)); ix = {n: k for k, n in enumerate(names)}
+            cands = self.db.execute("SELECT title, picked FROM candidates WHERE run_id = ? ORDER BY rank", (rid,)).fetchall()
+            yield date, {"sources": names, "src": [ix[src] for src, _, _ in sigs], "raw": [r for _, r, _ in sigs],
+                         "cand": [-1 if c is None else c for _, _, c in sigs], "titles": [t for t, _ in cands],
+                         "picked": [k for k, (_, p) in enumerate(cands) if p]}
+
+    def weekly_counts(self, before=DATE, weeks=TS_BASELINE_WEEKS):
+        """The last run of each of the `weeks` calendar weeks before the week of `before`, oldest first,
+        as (date, [(kind, key, signals)]): signal counts per source, per stored category list ("|"-joined,
+        None for runs from before categories were kept) and per rollup entity of the candidate they fed."""
+        monday = datetime.strptime(before, "%Y-%m-%d"); monday -= timedelta(days=monday.weekday())
+        latest = {}
+        for rid, d in self.db.execute("SELECT id, date FROM runs WHERE date >= ? AND date < ? ORDER BY date",
+                                      ((monday - timedelta(weeks=weeks)).strftime("%Y-%m-%d"), monday.strftime("%Y-%m-%d"))):
+            latest[datetime.strptime(d, "%Y-%m-%d").isocalendar()[:2]] = (d, rid)
+        sql = ("SELECT 'source', source, COUNT(*) FROM signals WHERE run_id = :r GROUP BY 2 UNION ALL "
+               "SELECT 'cat', cats, COUNT(*) FROM signals WHERE run_id = :r GROUP BY 2 UNION ALL "
+               "SELECT 'entity', c.entity, COUNT(*) FROM signals s JOIN candidates c ON c.run_id = s.run_id AND c.rank = s.cand "
+               "WHERE s.run_id = :r AND c.entity != '' GROUP BY 2")
+        return [(d, self.db.execute(sql, {"r": rid}).fetchall()) for d, rid in sorted(latest.values())]
+
+    def close(self):
+        if self._db is not None: self._db.close(); self._db = None
+
+HISTORY = HistoryStore()
+
+SIGNAL_ARCHIVE_DIR = os.environ.get("SIGNAL_ARCHIVE_DIR", "signal_archive")   # "" = don't archive
+SIGNAL_ARCHIVE_DAYS = int(os.environ.get("SIGNAL_ARCHIVE_DAYS", "365"))      # partitions kept (0 = forever)
+
+def archive_signals(all_sig, raw, root=SIGNAL_ARCHIVE_DIR, date=DATE):
+    """Append every signal of the run (source, title, desc, url, raw and normalized score, meta) to
+    root/date=YYYY-MM-DD/ as a new gzipped JSONL part; existing parts are never rewritten."""
+    part_dir = os.path.join(root, f"date={date}"); os.makedirs(part_dir, exist_ok=True)
+    path = os.path.join(part_dir, f"part-{datetime.now().strftime('%H%M%S')}-{os.getpid()}.jsonl.gz")
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8", compresslevel=6) as f:
+        for s, r in zip(all_sig.rows(), np.round(raw, 3).tolist()):
+            f.write(json.dumps({"ts": RUN_TS, "source": s.source, "title": s.title, "desc": s.desc, "url": s.url,
+                                "raw": r, "score": s.score, "meta": dict(s.meta)}, separators=(",", ":"), default=str) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+def prune_archive(root=SIGNAL_ARCHIVE_DIR, days=SIGNAL_ARCHIVE_DAYS, date=DATE):
+    """Delete the date= partitions more than `days` days before `date`; returns the dates removed."""
+    if days <= 0: return []
+    import shutil
+    cutoff = (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    try: old = sorted(d for d in os.listdir(root) if d.startswith("date=") and d[5:] < cutoff)
+    except FileNotFoundError: return []
+    for d in old: shutil.rmtree(os.path.join(root, d))
+    return [d[5:] for d in old]
+
+def iter_archive(start=None, end=None, sources=None, root=SIGNAL_ARCHIVE_DIR):
+    """Stream archived signals dated start..end (inclusive, YYYY-MM-DD; None = open), oldest first,
+    one decoded line at a time; each row gets its partition "date". Partitions outside the range
+    are skipped by directory name."""
+    try: parts = sorted(d for d in os.listdir(root) if d.startswith("date="))
+    except FileNotFoundError: return
+    for d in parts:
+        date = d[5:]
+        if (start and date < start) or (end and date > end): continue
+        for name in sorted(os.listdir(os.path.join(root, d))):
+            if not name.endswith(".jsonl.gz"): continue
+            with gzip.open(os.path.join(root, d, name), "rt", encoding="utf-8") as f:
+                for line in f:
+                    row = json.loads(line)
+                    if sources and row["source"] not in sources: continue
+                    row["date"] = date; yield row
+
+def load_previous_history():
+    """The most recent earlier run from the history store, for week-over-week comparison."""
+    try: return HISTORY.previous_run(DATE)
+    except Exception as e: log.warning(f"  History store {HISTORY.path} unreadable: {e}"); return None
+
+def match_previous(current_cands, prev_cands):
+    """For each current candidate, the index of the previous run's candidate it continues, or None.
+    Exact title first, then the same rollup entity, then the dedup matcher (_dedup_index prefilter +
+    _best_match); each previous candidate is claimed at most once, best-ranked current first."""
+    by_title = {}; by_entity = {}
+    for k, p in enumerate(prev_cands):
+        by_title.setdefault(p["title"], k)
+        if p.get("entity"): by_entity.setdefault(p["entity"], k)
+    index = _dedup_index([p["title"] for p in prev_cands])
+    for p in prev_cands: index.add(Candidate(title=p["title"]))
+    claimed = set(); out = []
+    for c in current_cands:
+        k = by_title.get(c.title)
+        if k is None and c.entity: k = by_entity.get(c.entity)
+        if k is None or k in claimed: k = _best_match(norm_title(c.title), index)
+        if k is not None and k in claimed: k = None
+        if k is not None: claimed.add(k)
+        out.append(k)
+    return out
+
+def compute_trends(current_cands, all_sig, previous_history, top=50):
+    """Week-over-week changes for KPIs and candidate scores. Every current candidate is matched to
+    the previous run's full candidate list (match_previous), so reworded headlines and climbers
+    from deep in last week's list count as movers; movers and new entries are reported for the
+    top `top`, dropped ones are previous top-30 candidates whose continuation left the top `top`."""
     if not previous_history:
         return {"kpi_deltas": {}, "movers": [], "new_entries": [], "dropped": []}
     prev_kpis = previous_history.get("kpis", {})
@@ -1339,20 +2139,21 @@ def compute_trends(current_cands, all_sig, previous_history):
         "multi_source": len([c for c in current_cands if c.sources >= 2]),
     }
     kpi_deltas = {k: curr_kpis.get(k, 0) - prev_kpis.get(k, 0) for k in curr_kpis}
-    prev_by_title = {c["title"]: c for c in previous_history.get("top_candidates", [])}
-    movers, new_entries = [], []
-    for c in current_cands[:50]:
-        prev = prev_by_title.get(c.title)
-        if prev:
-            delta = c.score - prev["score"]
-            if abs(delta) > 3:
-                movers.append({"title": c.title, "score": c.score, "prev_score": prev["score"], "delta": round(delta, 1)})
-        else:
-            new_entries.append({"title": c.title, "score": c.score})
-    curr_titles = {c.title for c in current_cands[:50]}
-    dropped = [{"title": c["title"], "prev_score": c["score"]}
-               for c in previous_history.get("top_candidates", [])[:30]
-               if c["title"] not in curr_titles]
+    prev = previous_history.get("candidates") or previous_history.get("top_candidates", [])
+    matches = match_previous(current_cands, prev)
+    movers, new_entries, kept = [], [], set()
+    for c, k in zip(current_cands[:top], matches):
+        if k is None:
+            new_entries.append({"title": c.title, "score": c.score}); continue
+        kept.add(k)
+        delta = c.score - prev[k]["score"]
+        if abs(delta) > 3:
+            mv = {"title": c.title, "score": c.score, "prev_score": prev[k]["score"], "delta": round(delta, 1)}
+            if prev[k]["title"] != c.title: mv["prev_title"] = prev[k]["title"]
+            movers.append(mv)
+    dropped = [{"title": p["title"], "prev_score": p["score"]} for k, p in enumerate(prev[:30]) if k not in kept]
+    log.debug(f"  Trends: {sum(k is not None for k in matches)} of {len(current_cands)} candidates matched "
+              f"{len(prev)} from {previous_history.get('date', '?')}")
     return {
         "kpi_deltas": kpi_deltas,
         "movers": sorted(movers, key=lambda x: -abs(x["delta"]))[:10],
@@ -1360,6 +2161,81 @@ def compute_trends(current_cands, all_sig, previous_history):
         "dropped": dropped[:10],
     }
 
+def _series_counts(groups):
+    """Signals per series for one run from (kind, key, n) groups: {("source"|"cat"|"entity", name): n},
+    plus the kinds the run has data for (runs stored before categories were kept have no "cat")."""
+    out = Counter(); seen = set()
+    for kind, key, n in groups:
+        if key is None: continue
+        seen.add(kind)
+        for name in (key.split("|") if key else ()) if kind == "cat" else (key,): out[kind, name] += n
+    return out, seen
+
+def _current_groups(cands, all_sig):
+    """This run's (kind, key, n) groups, the same shape HistoryStore.weekly_counts returns."""
+    out = [("source", all_sig.src_names[s], int(n)) for s, n in enumerate(np.bincount(all_sig.src, minlength=len(all_sig.src_names)))]
+    out += [("cat", "|".join(all_sig.cat_names[k] for k in cs), n) for cs, n in Counter(all_sig.cats).items()]
+    ents = Counter()
+    for c in cands:
+        if c.entity: ents[c.entity] += len(c.signals)
+    return out + [("entity", e, n) for e, n in ents.items()]
+
+def time_series_trends(cands, all_sig, store=None, date=DATE):
+    """Multi-week view of signal volume per source, KW category and rollup entity: this run against
+    the last run of each of the previous TS_BASELINE_WEEKS weeks. All series are one matrix (weeks a
+    series had no data for are NaN), so the baseline mean/std, z-score, week-over-week change and the
+    rolling average and least-squares slope over the last TS_SLOPE_WEEKS points are array ops."""
+    store = store or HISTORY
+    points = [(d, _series_counts(g)) for d, g in store.weekly_counts(date)] + [(date, _series_counts(_current_groups(cands, all_sig)))]
+    keys = sorted(set().union(*(cnt for _, (cnt, _) in points)))
+    out = {"weeks": [d for d, _ in points], "baseline": len(points) - 1, "series": len(keys), "spikes": [], "rising": []}
+    if not keys or len(points) < 2: return out
+    ix = {k: i for i, k in enumerate(keys)}; kinds = np.array([k for k, _ in keys])
+    X = np.full((len(keys), len(points)), np.nan)
+    for j, (_, (cnt, seen)) in enumerate(points):
+        X[np.isin(kinds, list(seen)), j] = 0
+        for k, n in cnt.items(): X[ix[k], j] = n
+    x = np.array([(datetime.strptime(d, "%Y-%m-%d") - datetime.strptime(points[0][0], "%Y-%m-%d")).days / 7 for d, _ in points])
+
+    B = X[:, :-1]; cur = np.nan_to_num(X[:, -1]); ok = ~np.isnan(B); nb = ok.sum(1)
+    mean = np.where(ok, B, 0).sum(1) / np.maximum(nb, 1)
+    std = np.sqrt((np.where(ok, B - mean[:, None], 0) ** 2).sum(1) / np.maximum(nb - 1, 1))
+    std = np.maximum(std, np.sqrt(np.maximum(mean, 1)))                  # counts: never below Poisson noise
+    z = (cur - mean) / std
+    last = B.shape[1] - 1 - np.argmax(ok[:, ::-1], 1)                     # latest baseline week with data
+    wow = np.where(nb > 0, cur - B[np.arange(len(keys)), last], np.nan)
+    R = X[:, -TS_SLOPE_WEEKS:]; xr = x[-TS_SLOPE_WEEKS:]; w = ~np.isnan(R); nr = w.sum(1); R = np.where(w, R, 0)
+    avg = R.sum(1) / np.maximum(nr, 1)
+    dx = np.where(w, xr - (w * xr).sum(1, keepdims=True) / np.maximum(nr, 1)[:, None], 0)
+    sxx = (dx ** 2).sum(1); slope = np.where(sxx > 0, (dx * (R - avg[:, None])).sum(1) / np.where(sxx > 0, sxx, 1), 0)
+
+    big = cur >= TS_MIN_COUNT
+    spike = big & (nb >= TS_MIN_WEEKS) & (mean > 0) & (z >= TS_SPIKE_Z)
+    rising = big & ~spike & (nr >= 3) & (slope > 0) & (cur > avg)
+    def entry(i):
+        return {"kind": keys[i][0], "name": keys[i][1], "cur": int(cur[i]), "mean": round(float(mean[i]), 1),
+                "std": round(float(std[i]), 1), "z": round(float(z[i]), 1), "wow": None if np.isnan(wow[i]) else int(wow[i]),
+                "avg": round(float(avg[i]), 1), "slope": round(float(slope[i]), 1), "weeks": int(nb[i]),
+                "history": [None if np.isnan(v) else int(v) for v in X[i]]}
+    out["spikes"] = [entry(i) for i in np.flatnonzero(spike)[np.argsort(-z[spike], kind="stable")][:15]]
+    out["rising"] = [entry(i) for i in np.flatnonzero(rising)[np.argsort(-(slope / np.maximum(avg, 1))[rising], kind="stable")][:10]]
+    return out
+
+def _series_label(e): return f"{e['name']} {'signals' if e['kind'] == 'source' else 'mentions'}"
+
+def series_lines(ts, limit=10):
+    """(series, sentence) for the spikes, then the fastest risers, e.g.
+    "Roblox mentions are 3.2σ above the 8-week baseline (45 vs 14±10)"."""
+    if not ts: return []
+    out = [(e, f"{_series_label(e)} are {e['z']:.1f}\u03c3 above the {e['weeks']}-week baseline "
+               f"({e['cur']} vs {e['mean']:.0f}\u00b1{e['std']:.0f})") for e in ts.get("spikes", [])[:limit]]
+    out += [(e, f"{_series_label(e)} are rising {e['slope']:+.1f}/week over the last {TS_SLOPE_WEEKS} weeks "
+                f"({e['cur']} this week, {TS_SLOPE_WEEKS}-week average {e['avg']:.0f})") for e in ts.get("rising", [])[:max(limit - len(out), 0)]]
+    return out
+
+def spike_text(ts, limit=10):
+    return "\n".join(f"- {line}" for _, line in series_lines(ts, limit))
+
 # =============================================================================
 # SECTION 5 - CONCURRENT ORCHESTRATOR
 # =============================================================================
@@ -1382,118 +2258,533 @@ def fetch_all():
     for name in sorted(fetchers.keys()):
         log.debug(f"  Queued: {name}")
     print("\n" + "="*60); print(f"FETCHING {len(fetchers)} SOURCES (concurrent)"); print("="*60)
-    results = {}
+    results = SignalTable()
     with ThreadPoolExecutor(max_workers=6) as ex:
         futs = {ex.submit(f.fetch):n for n,f in fetchers.items()}
         try:
             for fut in as_completed(futs, timeout=420):
                 n = futs[fut]
                 try:
-                    results[n] = fut.result(timeout=FETCH_TIMEOUT)
-                    log.debug(f"  Done: {n} -> {len(results[n])} items")
-                except TimeoutError: log.warning(f"  {n} took too long, skipping"); results[n] = []
-                except Exception as e: log.warning(f"  {n} ran into an error: {e}"); results[n] = []
+                    results.extend(n, fut.result(timeout=FETCH_TIMEOUT))
+                    log.debug(f"  Done: {n} -> {len(results.row_ids(n))} items")
+                except TimeoutError: log.warning(f"  {n} took too long, skipping"); results.extend(n, [])
+                except Exception as e: log.warning(f"  {n} ran into an error: {e}"); results.extend(n, [])
         except TimeoutError:
             for fut,n in futs.items():
                 if n not in results:
                     log.warning(f"  {n} was still running when time ran out, skipping")
-                    results[n] = []
-    total = sum(len(v) for v in results.values())
-    for n,s in sorted(results.items()): print(f"  {n}: {len(s)}")
-    failed = [n for n, s in results.items() if len(s) == 0]
+                    results.extend(n, [])
+    total = results.n
+    counts = {n: len(results.row_ids(n)) for n in results}
+    for n in sorted(counts): print(f"  {n}: {counts[n]}")
+    failed = [n for n, k in counts.items() if k == 0]
     if failed: log.info(f"  Sources that returned nothing: {', '.join(failed)}")
+    log_parse_stats()
+    log_kw_stats(); log_date_stats()
     print(f"  TOTAL: {total}"); return results
 
 # =============================================================================
 # SECTION 6 - DEDUP & MERGE
 # =============================================================================
 
-_ROMANS = {'vi':'6','vii':'7','viii':'8','ix':'9','iv':'4','iii':'3','ii':'2','xl':'40','xx':'20','xv':'15','x':'10'}
-
-def _normalize_title(text):
-    """Aggressive title normalization for dedup: lowercase, strip punctuation, convert roman numerals."""
-    lo = re.sub(r'[^a-z0-9 ]','',text.lower())
-    words = lo.split()
-    return ' '.join(_ROMANS.get(w, w) for w in words)
-
-def _merge_into_cands(sigs, cands):
-    """Merge signals into candidates using best-match fuzzy dedup with token pre-filter."""
-    for sig in sigs:
-        best_cand = None; best_ratio = 0.0
-        a_norm = _normalize_title(sig.title)
-        if not a_norm:
-            cands.append(Candidate(title=sig.title, signals=[sig])); continue
-        a_tokens = set(a_norm.split())
-        nums_a = re.findall(r'\d+', a_norm)
-        for c in cands:
-            b_norm = _normalize_title(c.title)
-            if not b_norm: continue
-            nums_b = re.findall(r'\d+', b_norm)
-            if nums_a and nums_b and nums_a != nums_b: continue
-            # Cheap pre-filter: token overlap (Jaccard)
-            b_tokens = set(b_norm.split())
-            union = a_tokens | b_tokens
-            jaccard = len(a_tokens & b_tokens) / len(union) if union else 0
-            if jaccard < 0.25: continue
-            r = SequenceMatcher(None, a_norm, b_norm).ratio()
-            if r >= FUZZ_T and r > best_ratio:
-                best_ratio = r; best_cand = c
-        if best_cand:
-            best_cand.signals.append(sig)
-        else:
-            cands.append(Candidate(title=sig.title, signals=[sig]))
+JACCARD_T = 0.25
+DEDUP_STOP_DF = int(os.environ.get("DEDUP_STOP_DF", "50"))          # tokens in more titles than this are stop tokens
+DEDUP_STOP_FRAC = float(os.environ.get("DEDUP_STOP_FRAC", "0.02"))   # a title still blocks on its rarest stop token below this share
+
+class _PrefixIndex:
+    """Rarest-first token prefix index for the Jaccard pre-filter, with PPJoin position/size bounds.
+    Tokens in over DEDUP_STOP_DF titles are stop tokens; lossy[i] marks titles that lost prefix tokens to them."""
+    def __init__(self, titles, t=JACCARD_T):
+        titles = list(titles)
+        self.t = t; self.norms = []
+        self.post = defaultdict(lambda: defaultdict(list))   # token -> set size -> sorted [(position, cand)]
+        self.df = Counter(w for title in titles for w in norm_title(title).tokens)
+        self.stop = {w for w, n in self.df.items() if n > DEDUP_STOP_DF}
+        self.ceiling = max(DEDUP_STOP_DF, int(DEDUP_STOP_FRAC * len(titles)))
+        self.partial = self.common_only = 0; self.lossy = []; self.keys = []
+
+    def _ordered(self, tokens):
+        """Rarest-first tokens, the indexable (position, token) prefix, and whether stop tokens were
+        dropped from it (1) / no token under the ceiling was left, so it is the whole prefix (2)."""
+        toks = self.rank(tokens)
+        pre = list(enumerate(toks[:len(toks) - math.ceil(self.t * len(toks) - 1e-9) + 1]))
+        keep = [(j, w) for j, w in pre if w not in self.stop]
+        if len(keep) == len(pre): return toks, pre, 0
+        j, w = pre[len(keep)]                       # rarest stop token in the prefix
+        if self.df.get(w, 0) <= self.ceiling: keep.append((j, w))
+        if not keep: return toks, pre, 2
+        return toks, keep, 1 if len(keep) < len(pre) else 0
+
+    def rank(self, tokens): return sorted(tokens, key=lambda w: (self.df.get(w, 0), w))
+
+    def add(self, c):
+        """Index the candidate appended at position len(self.norms)."""
+        nt = norm_title(c.title); i = len(self.norms); self.norms.append(nt)
+        toks, pre, stopped = self._ordered(nt.tokens); n = len(toks)
+        self.partial += stopped == 1; self.common_only += stopped == 2; self.lossy.append(stopped == 1)
+        self.keys.append(frozenset(w for _, w in pre))
+        for j, w in pre: insort(self.post[w][n], (j, i))
+
+    def query(self, nt):
+        """Positions (ascending) of candidates that can reach Jaccard >= t with nt."""
+        toks, pre, _ = self._ordered(nt.tokens); la = len(toks); t = self.t
+        hits = set()
+        for i, w in pre:
+            for lb, plist in self.post.get(w, {}).items():
+                if lb < t * la - 1e-9 or la < t * lb - 1e-9: continue
+                need = math.ceil(t / (1 + t) * (la + lb) - 1e-9)
+                if la - i < need: continue
+                # overlap <= 1 + tokens left after the first shared one, on both sides
+                hits.update(cid for _, cid in plist[:bisect_right(plist, (lb - need, math.inf))])
+        return sorted(hits)
+
+class _MinHashIndex:
+    """4-char shingle MinHash with LSH banding (DEDUP_BACKEND=minhash): titles sharing a band bucket pair up,
+    unless their signatures estimate a shingle-Jaccard below J_MIN. No token-Jaccard pre-filter (t = 0)."""
+    K, PERMS, BANDS, J_MIN = 4, 128, 32, 0.3
+    t = 0.0
+
+    def __init__(self, titles, seed=1):
+        rng = np.random.default_rng(seed); rows = self.PERMS // self.BANDS
+        self.a = rng.integers(1, 2**63, size=self.PERMS, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=self.PERMS, dtype=np.uint64)
+        self.mix = rng.integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+        self.norms = []; self.buckets = defaultdict(list)
+        self.csig = np.empty((64, self.PERMS), dtype=np.uint32)   # signature per candidate position
+        self.sigs = {}
+        norms = list(dict.fromkeys(n for n in (norm_title(t).norm for t in titles) if n))
+        for i in range(0, len(norms), 512): self._sign(norms[i:i+512])
+
+    def _sign(self, norms):
+        """MinHash signature + band keys for each of norms ([a-z0-9 ] strings), cached by norm."""
+        buf = np.frombuffer("\0".join(n.ljust(self.K) for n in norms).encode(), dtype=np.uint8).astype(np.uint64)
+        k = self.K; span = len(buf) - k + 1
+        shingles = sum(buf[j:j+span] << np.uint64(8 * (k - 1 - j)) for j in range(k))
+        seps = np.concatenate(([0], np.cumsum(buf == 0)))
+        valid = seps[k:k+span] == seps[:span]            # window does not cross a title boundary
+        seg = seps[:span][valid]; shingles = shingles[valid]
+        starts = np.flatnonzero(np.concatenate(([True], seg[1:] != seg[:-1])))
+        h = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+        sig = np.minimum.reduceat(h, starts, axis=1).T    # (titles, PERMS)
+        keys = (sig.reshape(len(norms), self.BANDS, -1) * self.mix).sum(axis=2).tolist()
+        for n, row, ks in zip(norms, sig.astype(np.uint32), keys): self.sigs[n] = (row, ks)
+
+    def _sig(self, norm):
+        if norm not in self.sigs: self._sign([norm])
+        return self.sigs[norm]
+
+    def add(self, c):
+        nt = norm_title(c.title); i = len(self.norms); self.norms.append(nt)
+        if not nt.norm: return
+        row, keys = self._sig(nt.norm)
+        if i >= len(self.csig): self.csig = np.concatenate([self.csig, np.empty_like(self.csig)])
+        self.csig[i] = row
+        for band, key in enumerate(keys): self.buckets[band, key].append(i)
+
+    def pairs(self, nts, window):
+        """Position pairs (a < b) of nts that share a band bucket and whose signatures estimate
+        shingle-Jaccard >= J_MIN, each once, in order; buckets over `window` titles are sorted by
+        normalized title and paired in windows. Also returns the sizes of the shared buckets."""
+        live = [a for a, nt in enumerate(nts) if nt.norm]
+        if not live: return [], []
+        rows = np.stack([self._sig(nts[a].norm)[0] for a in live])
+        keys = np.array([self._sig(nts[a].norm)[1] for a in live], dtype=np.uint64)
+        band = np.tile(np.arange(self.BANDS), len(live)); key = keys.ravel(); who = np.repeat(np.arange(len(live)), self.BANDS)
+        o = np.lexsort((who, key, band)); band, key, who = band[o], key[o], who[o]
+        cut = np.flatnonzero((band[1:] != band[:-1]) | (key[1:] != key[:-1])) + 1
+        starts = np.concatenate(([0], cut)); ends = np.concatenate((cut, [len(o)])); shared = ends - starts > 1
+        cand = set()
+        for s, e in zip(starts[shared].tolist(), ends[shared].tolist()):
+            members = who[s:e].tolist()
+            if len(members) > window: members = sorted(members, key=lambda x: nts[live[x]].norm)
+            cand.update((min(a, b), max(a, b)) for x, a in enumerate(members) for b in members[x+1:x+window])
+        sizes = (ends - starts)[shared].tolist()
+        if not cand: return [], sizes
+        p = np.array(sorted(cand), dtype=np.int64)
+        close = np.concatenate([(rows[p[k:k+65536, 0]] == rows[p[k:k+65536, 1]]).mean(axis=1) >= self.J_MIN
+                                for k in range(0, len(p), 65536)])
+        return [(live[a], live[b]) for a, b in p[close].tolist()], sizes
+
+    def query(self, nt):
+        row, keys = self._sig(nt.norm); hits = set()
+        for band, key in enumerate(keys): hits.update(self.buckets.get((band, key), ()))
+        if not hits: return []
+        hits = np.fromiter(sorted(hits), dtype=np.int64, count=len(hits))
+        return hits[(self.csig[hits] == row).mean(axis=1) >= self.J_MIN].tolist()
+
+DEDUP_BACKEND = os.environ.get("DEDUP_BACKEND", "index")   # "index" (token prefix index) | "minhash"
+
+def _dedup_index(titles):
+    """Candidate index for _best_match according to DEDUP_BACKEND."""
+    return _MinHashIndex(titles) if DEDUP_BACKEND == "minhash" else _PrefixIndex(titles)
+
+def _best_match(na, index):
+    """Position of the indexed candidate title most similar to na (ratio >= FUZZ_T), or None."""
+    best = None; best_ratio = 0.0
+    a_norm, nums_a, a_tokens = na.norm, na.nums, na.tokens
+    if not a_norm: return None
+    for i in index.query(na):
+        nb = index.norms[i]; b_norm, nums_b, b_tokens = nb.norm, nb.nums, nb.tokens
+        if nums_a and nums_b and nums_a != nums_b: continue
+        # Cheap pre-filter: token overlap (Jaccard)
+        jaccard = len(a_tokens & b_tokens) / len(a_tokens | b_tokens)
+        if jaccard < index.t: continue
+        floor = max(FUZZ_T, best_ratio)
+        if 2 * min(len(a_norm), len(b_norm)) < floor * (len(a_norm) + len(b_norm)): continue
+        sm = SequenceMatcher(None, a_norm, b_norm)
+        if sm.quick_ratio() < floor: continue
+        r = sm.ratio()
+        if r >= FUZZ_T and r > best_ratio:
+            best_ratio = r; best = i
+    return best
+
+DEDUP_WINDOW = int(os.environ.get("DEDUP_WINDOW", "10"))   # category/LSH neighbours a title is compared with
+DEDUP_STATS = {}
+
+def _similar(na, nb, t=JACCARD_T):
+    """Pairwise merge test on TitleNorms: number guard, token Jaccard >= t, ratio >= FUZZ_T."""
+    if na.nums and nb.nums and na.nums != nb.nums: return False
+    k = len(na.tokens & nb.tokens)
+    if k < t * (len(na.tokens) + len(nb.tokens) - k): return False
+    a, b = na.norm, nb.norm
+    if 2 * min(len(a), len(b)) < FUZZ_T * (len(a) + len(b)): return False
+    sm = SequenceMatcher(None, a, b)
+    return sm.quick_ratio() >= FUZZ_T and sm.ratio() >= FUZZ_T
+
+# Sources whose URLs identify one article, so equal canonical URLs are the same story
+# (competitor/epic signals share landing-page URLs across different items).
+URL_COLLAPSE_SOURCES = {"news", "oxylabs_news", "reddit", "sitemap", "youtube"}
+URL_DUPES = Counter()   # source -> signals collapsed into an earlier signal with the same URL
+
+def _url_key(sig):
+    if sig.source not in URL_COLLAPSE_SOURCES: return ""
+    u = _canon_url(sig.url)
+    return u if "/" in u.split("?")[0] else ""   # a bare host is a landing page, not an article
+
+def _cluster(flat):
+    """Group signals into candidates: same canonical URL joins outright, then union-find over the
+    index's (or LSH) candidate pairs that pass _similar; differing numbers never merge."""
+    norms = [norm_title(s.title) for s in flat]; n = len(flat)
+    parent = list(range(n)); nums = [nt.nums for nt in norms]   # per root: the cluster's numbers, () if none
+    def find(i):
+        while parent[i] != i: parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    by_url = {}; URL_DUPES.clear()
+    for i, sig in enumerate(flat):
+        u = _url_key(sig)
+        if not u: continue
+        if u in by_url: parent[i] = by_url[u]; URL_DUPES[sig.source] += 1
+        else: by_url[u] = i
+    reps = [i for i in range(n) if parent[i] == i]
+    st = Counter(); sizes = defaultdict(list); stop = {}
+    def union(ri, rj):
+        if nums[ri] and nums[rj] and nums[ri] != nums[rj]: st["number_guard"] += 1; return
+        lo, hi = min(ri, rj), max(ri, rj); parent[hi] = lo; nums[lo] = nums[lo] or nums[hi]; st["merged"] += 1
+    def compare(i, j, t):
+        """Test i, j unless they are in one cluster already; whether they were tested."""
+        ri, rj = find(i), find(j)
+        if ri == rj: return False
+        if _similar(norms[i], norms[j], t): union(ri, rj)
+        return True
+    if DEDUP_BACKEND == "minhash":
+        lsh = _MinHashIndex([flat[i].title for i in reps])
+        pairs, sizes["lsh"] = lsh.pairs([norms[i] for i in reps], DEDUP_WINDOW)
+        st["compared_lsh"] = sum(compare(reps[a], reps[b], lsh.t) for a, b in pairs)
+        st["same_cluster"] = len(pairs) - st["compared_lsh"]
+    else:
+        tok_index = _PrefixIndex(flat[i].title for i in reps); tested = 0
+        for i in reps:
+            hits = tok_index.query(norms[i]) if norms[i].norm else []
+            tok_index.add(flat[i])
+            if norms[i].norm: sizes["tok"].append(len(hits))
+            for j in hits: tested += compare(reps[j], i, JACCARD_T)   # tok_index positions are positions in reps
+        st["compared_tok"] = tested; st["same_cluster"] = sum(sizes["tok"]) - tested
+        pos = {i: k for k, i in enumerate(reps)}; keys = tok_index.keys
+        lossy = {i for i in reps if tok_index.lossy[pos[i]]}
+        rare = {i: norms[i].tokens - tok_index.stop for i in lossy}
+        def seen(i, j):   # the token stage saw (or could rule out) pairs sharing a rare token or an indexed one
+            return not rare[i].isdisjoint(norms[j].tokens) or not keys[pos[i]].isdisjoint(keys[pos[j]])
+        blocks = defaultdict(list)
+        for i in reps:
+            if norms[i].norm:
+                for c in dict.fromkeys(flat[i].cats): blocks[c].append(i)
+        rank = {}; h = DEDUP_WINDOW // 2; done = set(); tested = 0
+        near = defaultdict(list)   # lossy title -> (distance, j) to its neighbours in each of its category blocks
+        for members in blocks.values():
+            sizes["cat"].append(len(members))
+            if lossy.isdisjoint(members): continue
+            for i in members:
+                if i not in rank: rank[i] = tok_index.rank(norms[i].tokens)
+            members = sorted(members, key=rank.__getitem__)
+            for x, i in enumerate(members):
+                if i in lossy: near[i] += [(abs(y - x), j) for y, j in enumerate(members[max(0, x-h):x+h+1], max(0, x-h)) if j != i]
+        for i in sorted(near):
+            budget = DEDUP_WINDOW - 1
+            for _, j in sorted(near[i]):
+                if budget <= 0: break
+                p = (min(i, j), max(i, j))
+                if p in done or seen(i, j): continue
+                done.add(p); tested += compare(*p, JACCARD_T); budget -= 1
+        st["compared_cat"] = tested; st["lossy"] = len(lossy)
+        stop = {"stop_ceiling": tok_index.ceiling, "stop_tokens": len(tok_index.stop), "stop_partial": tok_index.partial,
+                "stop_common_only": tok_index.common_only}
+    st["compared"] = sum(v for k, v in st.items() if k.startswith("compared_"))
+    groups = defaultdict(list)
+    for i in range(n): groups[find(i)].append(flat[i])
+    DEDUP_STATS.clear()
+    DEDUP_STATS.update(signals=n, candidates=len(groups), all_pairs=n * (n - 1) // 2, url_dupes=dict(URL_DUPES), **st, **stop,
+                       blocks={k: {"n": len(v), "max": max(v), "mean": round(sum(v) / len(v), 1)} for k, v in sizes.items() if v})
+    return [Candidate(title=g[0].title, signals=g) for g in groups.values()]
+
+def log_dedup_stats():
+    d = DEDUP_STATS
+    if not d: return
+    if d.get("url_dupes"):
+        log.info(f"  Same-URL duplicates collapsed: {sum(d['url_dupes'].values())} ("
+                 + ", ".join(f"{k} {v}" for k, v in sorted(d["url_dupes"].items(), key=lambda x: -x[1])) + ")")
+    log.info("  Dedup blocks: " + ", ".join(f"{k} {b['n']} (max {b['max']}, mean {b['mean']})" for k, b in d["blocks"].items() if k != "tok")
+             + (f"; rare-token lookups max {d['blocks']['tok']['max']}, mean {d['blocks']['tok']['mean']}" if "tok" in d["blocks"] else "")
+             + (f"; {d['lossy']:,} titles compared with up to {DEDUP_WINDOW - 1} category neighbours" if d.get("lossy") else ""))
+    log.info(f"  Dedup comparisons: {d.get('compared', 0):,} of {d['all_pairs']:,} all-pairs ("
+             + ", ".join(f"{k[9:]} {v:,}" for k, v in d.items() if k.startswith("compared_")) + ") "
+             f"({d.get('merged', 0)} merges, {d.get('same_cluster', 0):,} skipped as already merged)")
+    if "stop_tokens" in d:
+        log.info(f"  Dedup stop tokens: {d.get('stop_tokens', 0)} in over {DEDUP_STOP_DF} titles; {d.get('stop_partial', 0):,} titles "
+                 f"lost prefix tokens to them, {d.get('stop_common_only', 0):,} had none in under {d.get('stop_ceiling', 0)} titles to block on")
+
+def _describe(c):
+    """Set a candidate's sources, markets, categories, biz category and URL from its signals."""
+    src_types = set(); all_cats = []; markets = []
+    for s in c.signals:
+        st = s.source
+        if st in ("news","google"): st = "news"
+        src_types.add(st)
+        all_cats.extend(s.cats)
+        markets.extend(s.meta.get("markets",[]))
+    c.sources = len(src_types)
+    c.markets = [m for m in SCAN_MARKETS if m in markets]
+    cat_counts = Counter(all_cats)
+    c.categories = [cat for cat,_ in cat_counts.most_common()]
+    c.category = c.categories[0] if c.categories else "General"
+    biz_counts = Counter(BIZ_CATS.get(cat,"GMG") for cat in c.categories)
+    c.biz_categories = [bc for bc,_ in biz_counts.most_common()]
+    c.biz_category = c.biz_categories[0] if c.biz_categories else "GMG"
+    c.url = _best_url(c.signals)
+    return c
 
 def dedup(all_sig):
-    flat = [s for sigs in all_sig.values() for s in sigs]
+    flat = all_sig.rows() if isinstance(all_sig, SignalTable) else [s for sigs in all_sig.values() for s in sigs]
     if not flat: return []
-    # Group by primary category for blocking (reduces O(n^2))
-    by_cat = defaultdict(list); no_cat = []
-    for sig in flat:
-        sig_cats = sig.meta.get("cats", [])
-        if sig_cats: by_cat[sig_cats[0]].append(sig)
-        else: no_cat.append(sig)
-    cands = []
-    for cat, sigs in by_cat.items():
-        _merge_into_cands(sigs, cands)
-    _merge_into_cands(no_cat, cands)
-    # Assign categories, sources, biz_category
-    for c in cands:
-        src_types = set(); all_cats = []
-        for s in c.signals:
-            st = s.source
-            if st in ("news","google"): st = "news"
-            src_types.add(st)
-            all_cats.extend(s.meta.get("cats",[]))
-        c.sources = len(src_types)
-        cat_counts = Counter(all_cats)
-        c.categories = [cat for cat,_ in cat_counts.most_common()]
-        c.category = c.categories[0] if c.categories else "General"
-        biz_counts = Counter(BIZ_CATS.get(cat,"GMG") for cat in c.categories)
-        c.biz_categories = [bc for bc,_ in biz_counts.most_common()]
-        c.biz_category = c.biz_categories[0] if c.biz_categories else "GMG"
-        c.url = _best_url(c.signals)
+    cands = _cluster(flat)
+    for c in cands: _describe(c)
+    log_dedup_stats()
     print(f"  {len(flat)} signals -> {len(cands)} candidates"); return cands
 
+# --- Entity rollup: "GTA 6 trailer" + "GTA VI delayed" + "Rockstar confirms GTA 6 price" -> one GTA 6 candidate
+ENTITY_ROLLUP = os.environ.get("ENTITY_ROLLUP", "1") == "1"
+_GENERIC_CATS = {"Gaming", "Gift Cards", "Mobile Top Up", "Esports"}
+# KW stems that are ordinary words or slang, so "<stem> <number>" rarely names one product
+_ENTITY_STOP_STEMS = {"switch", "quest", "silver", "nitro", "wow", "cod", "lol", "fut", "anime", "steam", "traveler"}
+# words after a number that make it a quantity ("Roblox 2 million robux"), not a sequel or version
+_QUANTITY_WORDS = ("million", "billion", "thousand", "k", "m", "bn", "mn", "percent", "off", "players", "users",
+                   "fans", "downloads", "views", "copies", "sales", "subscribers", "people", "times", "years",
+                   "months", "weeks", "days", "hours", "minutes", "games", "dollars", "usd", "eur", "gbp")
+
+def _entity_pattern():
+    """KW keyword stems (trailing numbers dropped: "EA FC 26" -> "ea fc", "GTA 6" -> "gta") followed by
+    a one- or two-digit number that is not a quantity, and stem -> entity name; matched against
+    norm_title().norm, so roman numerals count. Spelled-out names share their initialism's entity
+    ("grand theft auto" -> "GTA"). Stems under 3 characters and _ENTITY_STOP_STEMS are left out."""
+    stems = {}; by_cat = defaultdict(dict)
+    for cat, kws in KW.items():
+        if cat in _GENERIC_CATS: continue
+        for k in kws:
+            name = k.rstrip("0123456789 "); stem = _NON_ALNUM_SP.sub('', name.lower())
+            if len(stem) >= 3 and stem not in _ENTITY_STOP_STEMS and stem not in stems:
+                stems[stem] = name; by_cat[cat][stem] = name
+    for cat, own in by_cat.items():
+        canon = {}
+        for stem in own:
+            short = "".join(w[0] for w in stem.split())
+            canon[stem] = short if " " in stem and short in own else stem
+        for stem, c in canon.items():
+            group = [x for x in own if canon[x] == c]
+            stems[stem] = cat if _NON_ALNUM_SP.sub('', cat.lower()) in group else own[c]
+    alt = "|".join(map(re.escape, sorted(stems, key=len, reverse=True)))
+    qty = "|".join(_QUANTITY_WORDS)
+    return re.compile(rf"\b({alt}) ?(\d\d?)\b(?! (?:{qty})\b)"), stems
+
+_ENTITY_RE, _ENTITY_STEM = _entity_pattern()
+
+def entity_keys(title):
+    """Entity names ("GTA 6", "Black Ops 2") for every KW name directly followed by a version number
+    in the title, in order of appearance and without repeats."""
+    return list(dict.fromkeys(f"{_ENTITY_STEM[m[1]]} {m[2].lstrip('0') or '0'}" for m in _ENTITY_RE.finditer(norm_title(title).norm)))
+
+def rollup(cands):
+    """Entity-level rollup after comp_score. Candidates whose primary entity (the first KW name +
+    number in the title) is the same are joined; the best-scoring member keeps its title, takes
+    over the others' signals and keeps their headlines in members, and the merged candidates are
+    rescored. A title naming several entities ("GTA 6 coming to PS5 and Xbox first") only joins
+    its primary one, so it never links two entity groups."""
+    if not ENTITY_ROLLUP or not cands: return cands
+    parent = list(range(len(cands))); first = {}; label = {}
+    def find(i):
+        while parent[i] != i: parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    for i, c in enumerate(cands):
+        for key in entity_keys(c.title)[:1]:
+            label[i] = key
+            j = first.setdefault(key, i)
+            ri, rj = find(i), find(j)
+            if ri != rj: parent[max(ri, rj)] = min(ri, rj)   # root = best-scoring member (cands are sorted)
+    groups = defaultdict(list)
+    for i in range(len(cands)): groups[find(i)].append(i)
+    out = []
+    for root, idx in groups.items():
+        rep = cands[root]; rep.entity = label.get(root, "")
+        for i in idx[1:]:
+            c = cands[i]; rep.signals.extend(c.signals); rep.members.extend([c.title] + c.members)
+        if len(idx) > 1: _describe(rep)
+        out.append(rep)
+    merged = sum(len(idx) > 1 for idx in groups.values())
+    if merged:
+        log.info(f"  Entity rollup: {len(cands)} candidates -> {len(out)} ({merged} entities with several headlines, largest "
+                 + ", ".join(f"{cands[r].entity} {len(i)}" for r, i in sorted(groups.items(), key=lambda g: -len(g[1]))[:5] if len(i) > 1) + ")")
+    return comp_score(out)
+
 # =============================================================================
 # SECTION 7 - COMPOSITE SCORING  (BUG FIX: removed erroneous *100)
 # =============================================================================
 
+def _score_columns(sigs):
+    """(source type id, score) arrays for a list of signals, and the source type names;
+    "google" counts as "news". Rows of one SignalTable are gathered from its columns."""
+    t = sigs[0].t if sigs and type(sigs[0]) is SignalRow else None
+    if t is not None and all(type(s) is SignalRow and s.t is t for s in sigs):
+        types = ["news" if n == "google" else n for n in t.src_names]; names = list(dict.fromkeys(types))
+        rows = np.fromiter((s.i for s in sigs), np.intp, len(sigs))
+        return np.array([names.index(n) for n in types], np.int64)[t.src[rows]], t.score[rows], names
+    ids = {}
+    si = [ids.setdefault("news" if s.source == "google" else s.source, len(ids)) for s in sigs]
+    return np.array(si, np.int64), np.fromiter((s.score for s in sigs), np.float64, len(sigs)), list(ids)
+
 def comp_score(cands):
-    for c in cands:
-        by_src = defaultdict(list)
+    """Composite score: per candidate, the mean score of each source type weighted by W, times the
+    CONF multiplier for its number of sources; computed as grouped sums over every candidate's
+    signals at once (in the same order as a per-candidate loop), then sorted by score (stable)."""
+    if not cands: return cands
+    sigs = [s for c in cands for s in c.signals]
+    st, x, names = _score_columns(sigs)
+    ci = np.repeat(np.arange(len(cands)), [len(c.signals) for c in cands])
+    keys, first, inv = np.unique(ci * len(names) + st, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable"); rank = np.empty_like(order); rank[order] = np.arange(len(order))
+    inv = rank[inv.ravel()]; keys = keys[order]   # (candidate, source type) groups in first-seen order
+    mean = np.bincount(inv, weights=x) / np.bincount(inv)
+    cand, w = keys // len(names), np.array([W.get(n, 0.04) for n in names])[keys % len(names)]
+    ws = np.bincount(cand, weights=mean * w, minlength=len(cands)); tw = np.bincount(cand, weights=w, minlength=len(cands))
+    base = np.divide(ws, tw, out=np.zeros(len(cands)), where=tw > 0)
+    mult = np.array([CONF.get(c.sources, CONF_DEFAULT) for c in cands])
+    score = np.minimum(base * mult, 100)
+    score = np.array([round(v, 1) for v in score.tolist()])   # Python round: same ties as the scalar code
+    for c, v in zip(cands, score.tolist()): c.score = v
+    cands[:] = [cands[k] for k in np.argsort(-score, kind="stable")]; invalidate_cand_index(cands)
+    return cands
+
+def cands_in_market(cands, market):
+    """Candidates relevant to a market: seen in that market's results, or from market-agnostic sources only."""
+    return [c for c in cands if not c.markets or market in c.markets]
+
+RESCORE_SHIFT = float(os.environ.get("RESCORE_SHIFT", "0.1"))   # bound drift (x source span) that forces a full rescore
+
+class ScoringEngine:
+    """normalize_scores + dedup + comp_score kept current as signals arrive one at a time; a source whose
+    raw min/max drifts past shift x its span triggers a full rebuild from the raw scores."""
+
+    def __init__(self, all_sig=None, shift=RESCORE_SHIFT):
+        """all_sig: raw (not yet normalized) signals to start from, grouped with dedup."""
+        self.shift = shift; self.table = SignalTable(); self.raw = []
+        self.seen = {}; self.bounds = {}; self.rebuilds = 0
+        for sigs in (all_sig or {}).values():
+            for sig in sigs: self.table.append(sig); self.raw.append(sig.score); self._see(sig.source, sig.score)
+        self.cands = dedup(self.table) if self.table.n else []
+        self.home = [-1] * self.table.n   # row -> candidate position
+        for k, c in enumerate(self.cands):
+            for r in c.signals: self.home[r.i] = k
+        self.index = _dedup_index([c.title for c in self.cands])
+        for c in self.cands: self.index.add(c)
+        self.agg = []; self.rebuild()
+
+    def _see(self, source, x):
+        """Track the source's raw min/max. "drift" if it is now out of bounds by more than the shift,
+        "span" if the source's bounds were a single value and x gave them a span, else None."""
+        lo_hi = self.seen.get(source)
+        if lo_hi is None: self.seen[source] = [x, x]; self.bounds.setdefault(source, (x, x)); return None
+        lo_hi[0] = min(lo_hi[0], x); lo_hi[1] = max(lo_hi[1], x)
+        lo, hi = self.bounds[source]
+        if hi <= lo:   # no span yet, so nothing to measure drift against
+            if lo_hi[1] > lo_hi[0]: self.bounds[source] = tuple(lo_hi); return "span"
+            return None
+        tol = self.shift * (hi - lo)
+        return "drift" if lo_hi[0] < lo - tol or lo_hi[1] > hi + tol else None
+
+    def _rescore_source(self, source):
+        """Renormalize one source's rows with its bounds and rescore the candidates holding them."""
+        ks = set()
+        for i in self.table.row_ids(source).tolist():
+            self.table.score[i] = self._normalize(source, self.raw[i]); ks.add(self.home[i])
+        for k in ks:
+            if k >= 0: c = self.cands[k]; self.agg[k] = self._aggregate(c); c.score = self._score(c, self.agg[k])
+
+    def _normalize(self, source, x):
+        spec = SCORE_SPECS.get(source, ScoreSpec()); lo, hi = self.bounds[source]
+        v = spec.floor + (x - lo) / (hi - lo) * (spec.ceiling - spec.floor) if hi > lo else (spec.floor + spec.ceiling) / 2
+        return round(min(100, max(0, v)), 1)
+
+    @staticmethod
+    def _aggregate(c):
+        agg = {}
         for s in c.signals:
-            st = s.source
-            if st in ("news","google"): st = "news"
-            by_src[st].append(s.score)
+            st = "news" if s.source == "google" else s.source
+            a = agg.setdefault(st, [0.0, 0]); a[0] += s.score; a[1] += 1
+        return agg
+
+    @staticmethod
+    def _score(c, agg):
+        """comp_score for one candidate from its aggregates (same order of operations)."""
         ws = 0.0; tw = 0.0
-        for st,scores in by_src.items():
-            w = W.get(st,0.04)
-            ws += (sum(scores)/len(scores))*w; tw += w
-        base = ws/tw if tw > 0 else 0
-        mult = CONF.get(c.sources, CONF_DEFAULT)
-        c.score = round(min(base * mult, 100), 1)
-    cands.sort(key=lambda x: -x.score)
-    return cands
+        for st, (total, n) in agg.items():
+            w = W.get(st, 0.04); ws += total / n * w; tw += w
+        base = ws / tw if tw > 0 else 0
+        return round(min(base * CONF.get(c.sources, CONF_DEFAULT), 100), 1)
+
+    def rebuild(self):
+        """Renormalize every signal from its raw score and rescore every candidate."""
+        if self.table.n: self.table.score[:] = self.raw; normalize_scores(self.table)
+        self.bounds = {src: tuple(lo_hi) for src, lo_hi in self.seen.items()}
+        self.agg = [self._aggregate(c) for c in self.cands]
+        for c, agg in zip(self.cands, self.agg): c.score = self._score(c, agg)
+        self.rebuilds += 1
+
+    def add(self, sig):
+        """Add one signal with its raw score; returns the candidate it was merged into."""
+        row = self.table.append(sig); self.raw.append(sig.score)
+        k = _best_match(norm_title(sig.title), self.index)
+        if k is None:
+            k = len(self.cands); self.cands.append(Candidate(title=sig.title)); self.index.add(self.cands[k]); self.agg.append({})
+            invalidate_cand_index(self.cands)
+        c = self.cands[k]; c.signals.append(row); _describe(c); self.home.append(k)
+        state = self._see(sig.source, sig.score)
+        if state == "drift": self.rebuild(); return c
+        if state == "span": self._rescore_source(sig.source); return c
+        row.score = self._normalize(sig.source, sig.score)
+        a = self.agg[k].setdefault("news" if sig.source == "google" else sig.source, [0.0, 0]); a[0] += row.score; a[1] += 1
+        c.score = self._score(c, self.agg[k])
+        return c
+
+    def ranked(self):
+        """Candidates by score, as comp_score orders them."""
+        return sorted(self.cands, key=lambda c: -c.score)
 
 def get_top3_per_biz_cat(cands, opps):
     """For each business category (GMG/ENT/PPM/MTU), return top 3 items.
@@ -1606,7 +2897,7 @@ RULES:
     if result: print(f"  Got real-time intel ({len(result.get('sources',[]))} sources)"); return result
     print("  Grounding unavailable"); return {"text":"","sources":[]}
 
-def pass1(cands, events, ground_intel, all_sig=None):
+def pass1(cands, events, ground_intel, all_sig=None, series=None):
     print("AI PASS 1: Prioritize...")
     all_sig = all_sig or {}
 
@@ -1620,13 +2911,20 @@ def pass1(cands, events, ground_intel, all_sig=None):
     seen_t = set()
     unique_trending = []
     for t in trending_titles:
-        k = re.sub(r'[^a-z0-9]','',t[:60].lower())
+        k = _NON_ALNUM.sub('', t[:60].lower())
         if k not in seen_t: seen_t.add(k); unique_trending.append(t)
 
     trending_text = "\n".join(unique_trending[:80]) if unique_trending else "No trending signals this run."
-    market_text = "\n".join(f"{i+1}. [{c.score}] {c.title} (sources={c.sources}, cat={c.category})" for i,c in enumerate(cands[:20]))
+    market_text = "\n".join(f"{i+1}. [{c.score}] {c.title} (sources={c.sources}, cat={c.category})"
+                             + (f" +{len(c.members)} related: " + " | ".join(m[:70] for m in c.members[:2]) if c.members else "")
+                             for i,c in enumerate(cands[:20]))
     et = "\n".join(f"- {e['name']} ({e['category']}): {e['status']} - {e['description']}" for e in events[:15])
     intel = ground_intel.get("text","")[:2000]
+    series_text = spike_text(series)
+    if series_text:
+        series_text = ("\n=== SECTION A2: MULTI-WEEK MOMENTUM (signal counts vs. our own scans of the previous weeks) ===\n"
+                       "Use these to judge whether a Section A story is genuinely building; they are not picks by themselves.\n"
+                       + series_text + "\n")
 
     # Build numbered reference list of all available titles
     ref_titles = []; seen_ref = set()
@@ -1643,7 +2941,7 @@ TODAY: {NOW.strftime('%B %d, %Y')}
 === SECTION A: THIS WEEK'S TRENDING NEWS (from RSS, Reddit, YouTube, Google Trends) ===
 These are REAL headlines and posts from the past 7 days:
 {trending_text}
-
+{series_text}
 === SECTION B: REAL-TIME INTELLIGENCE (Google Search, verified today) ===
 {intel if intel else "Not available"}
 
@@ -1677,7 +2975,7 @@ Return JSON: {{"opportunities": [
              "confidence":min(c.score/100,1.0),"why_now":f"Across {c.sources} sources",
              "revenue_signal":"Multiple signals indicate purchase intent"} for c in cands[:15]]
 
-def pass3(opps, ground_intel):
+def pass3(opps, ground_intel, series=None):
     print("AI PASS 2: Executive synthesis (grounded)...")
     prompt = f"""You are the VP of Growth presenting to C-suite at Recharge.com.
 
@@ -1689,6 +2987,9 @@ THIS WEEK'S VERIFIED OPPORTUNITIES (AI-prioritized):
 REAL-TIME INTELLIGENCE:
 {ground_intel.get("text","")[:2000] if isinstance(ground_intel, dict) else ""}
 
+MULTI-WEEK MOMENTUM (our signal counts vs. previous weeks):
+{spike_text(series) or "Not enough history yet."}
+
 Write a razor-sharp executive briefing. No filler. Every word must be actionable.
 
 Return JSON:
@@ -1716,31 +3017,28 @@ CRITICAL: Each 'actions' entry must be a plain STRING. Do NOT nest objects."""
             "predictions":["Watch for major updates"],"risks":["Competitor pricing"]}
 
 def _fetch_competitor_news():
-    """Use Oxylabs to get real-time news about each competitor."""
+    """Use Oxylabs to get real-time news about each competitor, across all scanned markets."""
     if not OXYLABS_USER or not OXYLABS_PASS: return {}
-    comp_news = {}
     targets = list(COMPETITORS.keys()) + [c for c in SITEMAP_COMPETITORS if c not in COMPETITORS]
-    for name in targets:
-        try:
-            payload = {
-                "source": "google_search", "query": f'"{name}" gift card OR gaming OR digital OR top-up',
-                "parse": True, "context": [{"key":"tbm","value":"nws"},{"key":"tbs","value":"qdr:w"}],
-                "geo_location": "United States", "locale": "en-US", "limit": 5,
-            }
-            r = requests.post("https://realtime.oxylabs.io/v1/queries",
-                auth=(OXYLABS_USER, OXYLABS_PASS), json=payload, timeout=30)
-            if r.status_code != 200: continue
-            data = r.json()
-            results = data.get("results", [])
-            if not results: continue
-            content = results[0].get("content", {})
-            if not isinstance(content, dict): continue
-            items = content.get("results", {}).get("main", [])
-            comp_news[name] = [{"title":it.get("title",""),"source":it.get("source",""),
-                "age":it.get("relative_publish_date",""),"url":it.get("url",""),
-                "desc":it.get("desc","")} for it in items[:5] if it.get("title")]
-            time.sleep(0.3)
-        except Exception as e: log.debug(f"Competitor news {name}: {e}"); continue
+    jobs = [(name, mk) for name in targets for mk in SCAN_MARKETS]
+    results = {}
+    with ThreadPoolExecutor(max_workers=OXYLABS_WORKERS) as pool:
+        futs = {pool.submit(oxylabs_news, f'"{name}" gift card OR gaming OR digital OR top-up', mk, "qdr:w", 5): (name, mk)
+                for name, mk in jobs}
+        for fut in as_completed(futs):
+            try: results[futs[fut]] = fut.result()
+            except Exception as e: log.debug(f"Competitor news {futs[fut][0]} ({futs[fut][1]}): {e}"); results[futs[fut]] = []
+    comp_news = {}
+    for name, mk in jobs:
+        items = results.get((name, mk), [])
+        if not items and name not in comp_news: continue
+        arts = comp_news.setdefault(name, []); titles = {a["title"] for a in arts}
+        for it in items[:5]:
+            t = it.get("title")
+            if not t or t in titles: continue
+            titles.add(t)
+            arts.append({"title":t,"source":it.get("source",""),"age":it.get("relative_publish_date",""),
+                         "url":it.get("url",""),"desc":it.get("desc",""),"market":mk})
     return comp_news
 
 def pass_competitor(comp_signals, sitemap_signals):
@@ -1758,7 +3056,8 @@ def pass_competitor(comp_signals, sitemap_signals):
         if articles:
             news_text += f"\n{name} IN THE NEWS:\n"
             for a in articles:
-                news_text += f"  - [{a['age']}] {a['title']} (via {a['source']})\n"
+                mk = f", {a['market']}" if len(SCAN_MARKETS) > 1 else ""
+                news_text += f"  - [{a['age']}] {a['title']} (via {a['source']}{mk})\n"
     total_news = sum(len(v) for v in comp_news.values())
     print(f"  Got {total_news} competitor news articles")
     # 3. Build sitemap stats per competitor
@@ -1870,7 +3169,7 @@ def _validate_ai_output(data, required_keys, list_key=None):
     if list_key and not isinstance(data.get(list_key), list): return False
     return True
 
-def run_ai(cands, events, comp_sigs, all_sig=None):
+def run_ai(cands, events, comp_sigs, all_sig=None, series=None):
     print("\n" + "="*60); print("AI ANALYSIS (with Google Search grounding)"); print("="*60)
     log.info("  I'm reviewing all the data now. Here's my 4-pass approach:")
     log.info(f"  I have {len(cands)} opportunities, {len(events)} events, and {len(comp_sigs)} competitor signals to work with.")
@@ -1892,7 +3191,7 @@ def run_ai(cands, events, comp_sigs, all_sig=None):
     log.info("  Pass 2 of 4 — I'll pick the most important priorities from all this data...")
     t_p1 = time.time()
     try:
-        opps = pass1(cands, events, ground, all_sig or {})
+        opps = pass1(cands, events, ground, all_sig or {}, series)
         log.info(f"    Done in {time.time()-t_p1:.1f}s — I selected {len(opps)} top opportunities.")
         for o in opps[:5]:
             log.debug(f"    - {o.get('title','')[:50]} ({o.get('urgency','')})")
@@ -1912,7 +3211,7 @@ def run_ai(cands, events, comp_sigs, all_sig=None):
     ex = {"summary":"Analysis in progress.","actions":[],"predictions":[],"risks":[]}
     comp_intel = {"competitors":[],"market_summary":"","biggest_threat":"","opportunity_gap":""}
     with ThreadPoolExecutor(max_workers=2) as pool:
-        fut_ex = pool.submit(pass3, opps, ground)
+        fut_ex = pool.submit(pass3, opps, ground, series)
         fut_comp = pool.submit(pass_competitor, comp_sigs, (all_sig or {}).get("sitemap", []))
         try:
             ex = fut_ex.result(timeout=120)
@@ -1994,6 +3293,10 @@ def build_html(cands, ai, events, all_sig, top3=None, trends=None):
     for o in opps[:15]:
         mc = _match_cand(o.get("title",""),cands)
         score_data.append({"label":o.get("title","")[:40],"score":mc.score if mc else 0})
+    market_select = ""
+    if len(SCAN_MARKETS) > 1:
+        market_select = ('<select id="oppMarket" class="search-input" style="width:auto"><option value="">All markets</option>'
+                         + "".join(f'<option value="{m}">{m}</option>' for m in SCAN_MARKETS) + '</select>')
     score_labels = json.dumps([d["label"] for d in score_data])
     score_values = json.dumps([d["score"] for d in score_data])
 
@@ -2001,11 +3304,14 @@ def build_html(cands, ai, events, all_sig, top3=None, trends=None):
     for i,o in enumerate(opps[:15],1):
         mc = _match_cand(o.get("title",""),cands)
         sc = f"{mc.score}" if mc else "-"; sr = str(mc.sources) if mc else "-"; url = mc.url if mc else ""
+        mk_attr = " ".join(mc.markets) if mc and mc.markets else "*"
         urg = o.get("urgency",""); urg_cls = {"critical":"urg-crit","high":"urg-high","medium":"urg-med"}.get(urg,"urg-med")
         title_html = f'<a href="{esc(url)}" target="_blank" rel="noopener">{esc(o.get("title",""))}</a>' if url else esc(o.get("title",""))
+        if mc and mc.members:
+            title_html += f' <span class="t2" title="{esc(" | ".join(mc.members[:10]))}">+{len(mc.members)} related</span>'
         dom = _domain(url)
         src_html = f'<a href="{esc(url)}" target="_blank" class="src-link">{esc(dom)}</a>' if dom else '<span class="t2">-</span>'
-        opp_rows += f"""<tr><td class="rank">{i}</td><td class="opp-title">{title_html}</td>
+        opp_rows += f"""<tr data-markets="{esc(mk_attr)}"><td class="rank">{i}</td><td class="opp-title">{title_html}</td>
 <td><span class="cat-tag">{esc(o.get('category',''))}</span></td><td class="score-val">{sc}</td><td>{sr}</td>
 <td><span class="badge {urg_cls}">{urg.upper()}</span></td><td class="rev-sig">{esc(o.get('revenue_signal',''))[:80]}</td>
 <td class="src-cell">{src_html}</td></tr>"""
@@ -2095,6 +3401,13 @@ def build_html(cands, ai, events, all_sig, top3=None, trends=None):
 
     pred_html = "".join(f"<li>{esc(p)}</li>" for p in ex.get("predictions",[]))
     risk_html = "".join(f"<li>{esc(r)}</li>" for r in ex.get("risks",[]))
+    def _spark(hist):
+        top = max([v for v in hist if v is not None] or [1]) or 1
+        return "".join(" " if v is None else "\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588"[min(7, v * 8 // (top + 1))] for v in hist)
+    series_html = "".join(f'<li>{esc(line)} <span class="t2" style="font-family:monospace" title="{esc(", ".join(trends["series"]["weeks"]))}">'
+                          f'{_spark(e["history"])}</span></li>' for e, line in series_lines(trends.get("series"), 12))
+    if series_html:
+        series_html = f'<div class="card"><h2>\U0001F4C8 Multi-Week Momentum</h2><ul style="font-size:13px;padding-left:16px">{series_html}</ul></div>\n'
 
     # Pre-compute hero category highlights (avoids nested f-string {{}} issue)
     cat_highlights = ex.get("category_highlights", {})
@@ -2271,8 +3584,8 @@ td{{padding:10px 12px;border-bottom:1px solid var(--border)}}tr{{transition:back
 <div class="chart-box"><h3>Candidates by Category</h3><canvas id="catChart"></canvas></div></div>
 <div class="card"><div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;flex-wrap:wrap;gap:8px">
 <h2 style="border:none;margin:0;padding:0">Top Opportunities</h2>
-<input id="oppSearch" type="text" placeholder="Search opportunities..." class="search-input"
- onfocus="this.style.borderColor='var(--accent)'" onblur="this.style.borderColor='var(--border)'" />
+<div style="display:flex;gap:8px;flex-wrap:wrap">{market_select}<input id="oppSearch" type="text" placeholder="Search opportunities..." class="search-input"
+ onfocus="this.style.borderColor='var(--accent)'" onblur="this.style.borderColor='var(--border)'" /></div>
 </div><div class="table-wrap"><table id="oppTable" role="grid" aria-label="Top Opportunities"><thead><tr>
 <th scope="col" data-sort="num">#</th><th scope="col" data-sort="text">Opportunity</th><th scope="col" data-sort="text">Category</th><th scope="col" data-sort="num">Score</th><th scope="col" data-sort="num">Sources</th><th scope="col" data-sort="text">Urgency</th><th scope="col">Revenue Signal</th><th scope="col">Source</th>
 </tr></thead><tbody>{opp_rows}</tbody></table></div></div>
@@ -2282,7 +3595,7 @@ td{{padding:10px 12px;border-bottom:1px solid var(--border)}}tr{{transition:back
 <div class="two-col">
 <div class="card"><h2>\U0001F52E Predicted Trends</h2><ul style="font-size:13px;padding-left:16px">{pred_html}</ul></div>
 <div class="card"><h2>\U0001F6A8 Risk Watchlist</h2><ul style="font-size:13px;padding-left:16px">{risk_html}</ul></div></div>
-<div class="card"><h2 class="collapsible">Events Calendar</h2><div class="collapsible-content"><div class="table-wrap"><table><thead><tr><th scope="col">Event</th><th scope="col">Category</th><th scope="col">Status</th><th scope="col">Details</th></tr></thead>
+{series_html}<div class="card"><h2 class="collapsible">Events Calendar</h2><div class="collapsible-content"><div class="table-wrap"><table><thead><tr><th scope="col">Event</th><th scope="col">Category</th><th scope="col">Status</th><th scope="col">Details</th></tr></thead>
 <tbody>{events_rows}</tbody></table></div></div></div>
 <div class="card"><h2 class="collapsible collapsed">How It Works</h2><div class="collapsible-content hidden">
 <div style="margin-bottom:20px">
@@ -2360,9 +3673,10 @@ document.querySelectorAll('th[data-sort]').forEach(th=>{{
   }});
 }});
 
-// Search filter
-const si=document.getElementById('oppSearch');
-if(si){{si.addEventListener('input',e=>{{const q=e.target.value.toLowerCase();document.querySelectorAll('#oppTable tbody tr').forEach(row=>{{row.style.display=row.textContent.toLowerCase().includes(q)?'':'none'}})}})}};
+// Search + market filter
+const si=document.getElementById('oppSearch'),ms=document.getElementById('oppMarket');
+function oppFilter(){{const q=si?si.value.toLowerCase():'',m=ms?ms.value:'';document.querySelectorAll('#oppTable tbody tr').forEach(row=>{{const mk=row.dataset.markets||'*';row.style.display=row.textContent.toLowerCase().includes(q)&&(!m||mk==='*'||mk.split(' ').includes(m))?'':'none'}})}}
+if(si)si.addEventListener('input',oppFilter);if(ms)ms.addEventListener('change',oppFilter);
 
 // Collapsible sections
 document.querySelectorAll('.collapsible').forEach(el=>{{
@@ -2773,7 +4087,13 @@ def send_email(html_body, subject=None):
 # SECTION 13 - EVENTS CALENDAR
 # =============================================================================
 
-def get_events():
+EVENT_QUERIES = ["game announcement today","release date announced","new update live","free games announced",
+                 "PlayStation Plus reveal","Game Pass announced","Nintendo Direct date","Steam sale date",
+                 "EA FC promo","Genshin banner","anime premiere","Crunchyroll new"]
+STREAMING_SERVICES = ["Netflix","Prime Video","Disney Plus","Crunchyroll"]
+
+def _calendar_events():
+    """Static release/sale calendar for the next 60 days (no network)."""
     today = NOW
     cal = [
         (2,27,28,"Resident Evil Requiem","Game Release","PS5/XSX/Switch 2/PC",9),
@@ -2879,41 +4199,43 @@ def get_events():
                 events.append({"name":name,"category":cat,"description":desc,"status":st,"urgency":urg,"days_until":days,"priority":pri,"is_live":False})
         except Exception as e:
             log.debug(f"Event '{name}': {e}"); continue
-    seen = set()
-    for q in ["game announcement today","release date announced","new update live","free games announced",
-              "PlayStation Plus reveal","Game Pass announced","Nintendo Direct date","Steam sale date",
-              "EA FC promo","Genshin banner","anime premiere","Crunchyroll new"]:
-        try:
-            feed = feedparser.parse(f"https://news.google.com/rss/search?q={quote(q)}+when:3d&hl=en-US&gl=US&ceid=US:en")
-            for e in feed.entries[:3]:
-                t = e.get("title",""); src = "News"
-                if " - " in t: t,src = t.rsplit(" - ",1)
-                k = t[:40].lower()
-                if k in seen: continue
-                seen.add(k); lo = t.lower()
-                if any(x in lo for x in ["announce","reveal","launch","release","live now","available now","sale","event","promo","premiere"]):
-                    cc = cats(t); cat2 = cc[0] if cc else "Gaming"
-                    if any(x in lo for x in ["live now","out now","available now","today"]): urg,st = "critical","LIVE NOW"
-                    elif any(x in lo for x in ["tomorrow","coming soon","this week"]): urg,st = "high","SOON"
-                    else: urg,st = "medium","ANNOUNCED"
-                    events.append({"name":t[:80],"category":cat2,"description":f"via {src}","status":st,"urgency":urg,
-                                   "days_until":0 if urg=="critical" else 1,"priority":9 if urg=="critical" else 7,"is_live":True})
-            time.sleep(0.2)
-        except Exception as e:
-            log.debug(f"Event discovery '{q[:30]}': {e}"); continue
-    for svc in ["Netflix","Prime Video","Disney Plus","Crunchyroll"]:
-        try:
-            feed = feedparser.parse(f"https://news.google.com/rss/search?q={quote(svc)}+new+release+when:7d&hl=en-US&gl=US&ceid=US:en")
-            for e in feed.entries[:5]:
-                t = e.get("title","")
-                if " - " in t: t = t.rsplit(" - ",1)[0]
-                if any(k in t.lower() for k in ["premieres","launches","releases","arrives","streaming","drops"]):
-                    events.append({"name":f"{svc}: {t[:50]}","category":svc,"description":"Streaming release","status":"NOW","urgency":"high","days_until":0,"priority":7,"is_live":True})
-            time.sleep(0.1)
-        except Exception as e:
-            log.debug(f"Streaming events {svc}: {e}"); continue
+    return events
+
+def _discover_live_events():
+    """Live event discovery from Google News. All queries are fetched concurrently through
+    fetch_feed; results are folded in query order so the output is deterministic."""
+    urls = [gnews_url(q, when="3d") for q in EVENT_QUERIES]
+    urls += [gnews_url(f"{svc} new release", when="7d") for svc in STREAMING_SERVICES]
+    feeds = fetch_feeds(urls)
+    events = []; seen = set()
+    for u in urls[:len(EVENT_QUERIES)]:
+        for e in feeds[u][:3]:
+            t = e.get("title",""); src = "News"
+            if " - " in t: t,src = t.rsplit(" - ",1)
+            k = t[:40].lower()
+            if k in seen: continue
+            seen.add(k); lo = t.lower()
+            if any(x in lo for x in ["announce","reveal","launch","release","live now","available now","sale","event","promo","premiere"]):
+                cc = cats(t); cat2 = cc[0] if cc else "Gaming"
+                if any(x in lo for x in ["live now","out now","available now","today"]): urg,st = "critical","LIVE NOW"
+                elif any(x in lo for x in ["tomorrow","coming soon","this week"]): urg,st = "high","SOON"
+                else: urg,st = "medium","ANNOUNCED"
+                events.append({"name":t[:80],"category":cat2,"description":f"via {src}","status":st,"urgency":urg,
+                               "days_until":0 if urg=="critical" else 1,"priority":9 if urg=="critical" else 7,"is_live":True})
+    for svc,u in zip(STREAMING_SERVICES, urls[len(EVENT_QUERIES):]):
+        for e in feeds[u][:5]:
+            t = e.get("title","")
+            if " - " in t: t = t.rsplit(" - ",1)[0]
+            if any(k in t.lower() for k in ["premieres","launches","releases","arrives","streaming","drops"]):
+                events.append({"name":f"{svc}: {t[:50]}","category":svc,"description":"Streaming release","status":"NOW","urgency":"high","days_until":0,"priority":7,"is_live":True})
+    return events
+
+def _sort_events(events):
     return sorted(events,key=lambda x:(-x["priority"] if x["urgency"]=="critical" else 0,x.get("days_until",99)))
 
+def get_events():
+    return _sort_events(_calendar_events() + _discover_live_events())
+
 # =============================================================================
 # MAIN
 # =============================================================================
@@ -2946,6 +4268,7 @@ def main():
     log.info("First, let me check my setup...")
     log.info(f"  AI brain (Gemini): {'ready to go!' if GEMINI_KEY else 'not configured — I will skip AI analysis'}")
     log.info(f"  News search (Oxylabs): {'ready — I can search Google News' if OXYLABS_USER and OXYLABS_PASS else 'not configured — I will rely on RSS feeds only'}")
+    log.info(f"  Markets: {', '.join(MARKETS[m]['geo'] for m in SCAN_MARKETS)}")
     log.info(f"  Dashboard password: {'enabled — only people with the password can view it' if DASH_PASSWORD else 'disabled — anyone with the link can see it'}")
     log.info(f"  Competitors I'm watching: {', '.join(list(COMPETITORS.keys()) + [c for c in SITEMAP_COMPETITORS if c not in COMPETITORS])}")
     log.info(f"  Competitor blogs I read: {', '.join(BLOG_OVERRIDES.keys())}")
@@ -2956,15 +4279,15 @@ def main():
     log.info("=" * 50)
     log.info("STEP 1: Let me check what events and game releases are coming up...")
     log.info("=" * 50)
+    start_parse_pool()   # fork parse workers before any fetcher/discovery threads exist
     _phase("events")
-    events = get_events()
+    events = _calendar_events()
+    # Live event discovery runs alongside the main fetch instead of in front of it
+    _events_pool = ThreadPoolExecutor(max_workers=1)
+    live_events_fut = _events_pool.submit(_discover_live_events)
+    _events_pool.shutdown(wait=False)
     _phase_end("events")
-    log.info(f"  I found {len(events)} upcoming events — game launches, sales, streaming releases, and more.")
-    for ev in events[:10]:
-        log.info(f"    - {ev.get('name','')[:70]} ({ev.get('category','')})")
-    if len(events) > 10:
-        log.info(f"    ... and {len(events)-10} more")
-    print(f"Events: {len(events)}"); sys.stdout.flush()
+    log.info(f"  I found {len(events)} calendar events; I'll look for live announcements while the sources load.")
 
     # --- Phase 2: Data Fetching ---
     log.info("")
@@ -2978,6 +4301,19 @@ def main():
     _phase("fetch")
     all_sig = fetch_all()
     _phase_end("fetch")
+    try:
+        live_events = live_events_fut.result(timeout=120)
+    except Exception as e:
+        log.warning(f"  Live event discovery didn't finish ({e}) — using the calendar only.")
+        live_events = []
+    events = _sort_events(events + live_events)
+    stop_parse_pool()
+    log.info(f"  I found {len(events)} upcoming events ({len(live_events)} live) — game launches, sales, streaming releases, and more.")
+    for ev in events[:10]:
+        log.info(f"    - {ev.get('name','')[:70]} ({ev.get('category','')})")
+    if len(events) > 10:
+        log.info(f"    ... and {len(events)-10} more")
+    print(f"Events: {len(events)}"); sys.stdout.flush()
 
     # Detailed per-source log
     _source_labels = {
@@ -3013,6 +4349,7 @@ def main():
     log.info("  Each source uses different scoring systems, so I normalize them all")
     log.info("  to a 0-100 scale so they can be compared apples-to-apples.")
     _phase("normalize")
+    raw_scores = all_sig.score.copy()   # kept for the backtest record in the history file
     normalize_scores(all_sig)
     _phase_end("normalize")
 
@@ -3024,7 +4361,8 @@ def main():
     log.info("  Many sources report the same news. I'll merge duplicates and give")
     log.info("  higher scores to items that appear across multiple sources.")
     _phase("dedup")
-    cands = comp_score(dedup(all_sig))
+    cands = rollup(comp_score(dedup(all_sig)))
+    _cand_index(cands)
     _phase_end("dedup")
     multi_source = len([c for c in cands if c.sources >= 2])
     log.info(f"")
@@ -3037,11 +4375,14 @@ def main():
             cat_counter[cat] += 1
     top_kw_cats = cat_counter.most_common(10)
     log.info(f"  Keyword categories found: {', '.join(f'{cat} ({n})' for cat, n in top_kw_cats)}")
+    if len(SCAN_MARKETS) > 1:
+        log.info(f"  By market: {', '.join(f'{m} ({len(cands_in_market(cands, m))})' for m in SCAN_MARKETS)}")
     log.info(f"")
     log.info(f"  Here are the top 10 by score:")
     for i, c in enumerate(cands[:10], 1):
         multi_tag = f" [from {c.sources} sources]" if c.sources >= 2 else ""
-        log.info(f"    {i:2d}. {c.title[:65]}{multi_tag} (score: {c.score:.0f})")
+        rel_tag = f" [+{len(c.members)} related]" if c.members else ""
+        log.info(f"    {i:2d}. {c.title[:65]}{multi_tag}{rel_tag} (score: {c.score:.0f})")
 
     # --- Step 5: History Comparison ---
     log.info("")
@@ -3052,6 +4393,8 @@ def main():
     _phase("trends")
     prev_history = load_previous_history()
     trends = compute_trends(cands, all_sig, prev_history)
+    try: trends["series"] = time_series_trends(cands, all_sig)
+    except Exception as e: log.warning(f"  Multi-week trends unavailable: {e}")
     _phase_end("trends")
     if trends["kpi_deltas"]:
         d = trends["kpi_deltas"]
@@ -3067,6 +4410,10 @@ def main():
         print(f"  Week-over-week: signals {sig_d:+d}, candidates {cand_d:+d}")
     else:
         log.info(f"  No previous scan found — this is either my first run or the history file was removed.")
+    ts = trends.get("series") or {}
+    if ts.get("baseline"):
+        log.info(f"  Over the last {ts['baseline']} weeks of scans, {len(ts['spikes'])} of {ts['series']} series spiked:")
+        for _, line in series_lines(ts, 5): log.info(f"    {line}")
 
     # --- Step 6: AI Analysis ---
     log.info("")
@@ -3080,7 +4427,7 @@ def main():
     log.info("    I'll analyze competitors and their moves...")
     log.info("  This is the longest step — it may take a few minutes.")
     _phase("ai")
-    ai = run_ai(cands, events, all_sig.get("competitor",[]), all_sig)
+    ai = run_ai(cands, events, all_sig.get("competitor",[]), all_sig, trends.get("series"))
     _phase_end("ai")
     sys.stdout.flush()
     n_opps = len(ai.get('opportunities',[]))
@@ -3192,23 +4539,24 @@ def main():
         log.warning(f"  (Email credentials may not be configured — the HTML file is still saved)")
         print(f"[WARN] send_email: {type(e).__name__}: {e}"); sys.stdout.flush()
 
-    # Save weekly history for future trend comparison
+    # Save this run to the history store for trend comparison and backtests
     log.info("  I'm saving this week's results so I can compare next time...")
     try:
-        history_file = f"history_{DATE}.json"
-        history_data = {
-            "date": DATE, "version": "5.0",
-            "kpis": {"total_signals": sum(len(v) for v in all_sig.values()),
-                     "candidates": len(cands),
-                     "multi_source": len([c for c in cands if c.sources >= 2]),
-                     "sources_active": len([k for k,v in all_sig.items() if len(v)>0])},
-            "top_candidates": [{"title":c.title, "score":c.score, "sources":c.sources,
-                                "category":c.category, "biz_category":c.biz_category}
-                               for c in cands[:50]],
-        }
-        with open(history_file, "w") as f: json.dump(history_data, f, indent=2)
-        log.info(f"  History saved: {history_file}")
-    except Exception as e: log.debug(f"History save: {e}")
+        kpis = {"total_signals": sum(len(v) for v in all_sig.values()), "candidates": len(cands),
+                "multi_source": len([c for c in cands if c.sources >= 2]),
+                "sources_active": len([k for k,v in all_sig.items() if len(v)>0])}
+        HISTORY.save_run(kpis, cands, all_sig, raw_scores, picked_ranks(cands, ai.get("opportunities", [])))
+        log.info(f"  History saved: {HISTORY.path} ({len(cands)} candidates, {all_sig.n} signals)")
+    except Exception as e: log.warning(f"  History save failed: {e}")
+    if SIGNAL_ARCHIVE_DIR:
+        try: log.info(f"  Signals archived: {archive_signals(all_sig, raw_scores)}")
+        except Exception as e: log.warning(f"  Signal archive failed: {e}")
+        try:
+            old = prune_archive()
+            if old: log.info(f"  Signal archive: dropped {len(old)} partitions older than {SIGNAL_ARCHIVE_DAYS} days ({old[0]}..{old[-1]})")
+        except Exception as e: log.warning(f"  Signal archive pruning failed: {e}")
+    try: SEEN.save()
+    except Exception as e: log.warning(f"  Seen index save failed: {e}")
 
     # --- Final Summary ---
     elapsed = time.time()-t0; ex = ai.get("executive",{}); n_sources = len([k for k,v in all_sig.items() if len(v)>0])
@@ -3257,6 +4605,440 @@ def main():
     sys.stdout.flush()
     return html_file, docx_file
 
+# =============================================================================
+# SECTION 15 - BENCHMARKS
+# =============================================================================
+
+def _bench_titles(n, seed=7):
+    """n synthetic headlines: KW keywords, common filler words and a long-tailed vocabulary of
+    made-up names (real headline vocabularies are large, most words are rare)."""
+    rnd = random.Random(seed)
+    kws = [k for v in KW.values() for k in v]
+    filler = ("new update season free weekend patch leak trailer review best price deal "
+              "players launch event week record sales code the and for with").split()
+    syl = "ka ro mi ta ve lo zu ni sha dor el an fi gra po tu".split()
+    vocab = ["".join(rnd.choice(syl) for _ in range(rnd.randint(2, 4))) for _ in range(20_000)]
+    def word():
+        r = rnd.random()
+        if r < 0.15: return rnd.choice(kws)
+        if r < 0.45: return rnd.choice(filler)
+        return vocab[min(int(rnd.paretovariate(0.8)) - 1, len(vocab) - 1)] if r < 0.6 else rnd.choice(vocab)
+    return [" ".join(word() for _ in range(rnd.randint(6, 14))).capitalize() for _ in range(n)]
+
+def _cats_naive(text):
+    """Pre-compiled-matcher reference: one substring test per keyword."""
+    lo = text.lower()
+    return [c for c, kws in KW.items() if any(k.lower() in lo for k in kws)]
+
+def bench_kw(n=100_000):
+    titles = _bench_titles(n)
+    t0 = time.perf_counter(); ref = [_cats_naive(t) for t in titles]; t_ref = time.perf_counter() - t0
+    t0 = time.perf_counter(); got = [list(KW_MATCHER.match(t)) for t in titles]; t_new = time.perf_counter() - t0
+    wb = KeywordMatcher(KW, word_boundary=True)
+    t0 = time.perf_counter(); got_wb = [list(wb.match(t)) for t in titles]; t_wb = time.perf_counter() - t0
+    diff = sum(a != b for a, b in zip(ref, got))
+    print(f"KW matcher over {n:,} titles ({sum(len(v) for v in KW.values())} keywords, {len(KW)} categories)")
+    print(f"  naive substring loop : {t_ref:6.2f}s  {n/t_ref:>10,.0f} titles/s")
+    print(f"  compiled regex       : {t_new:6.2f}s  {n/t_new:>10,.0f} titles/s  ({t_ref/t_new:.1f}x, {diff} mismatches)")
+    print(f"  compiled, whole words: {t_wb:6.2f}s  {n/t_wb:>10,.0f} titles/s  "
+          f"({sum(a != b for a, b in zip(ref, got_wb))} titles classified differently)")
+
+def _merge_into_cands_naive(sigs, cands):
+    """Pre-index reference: every signal is compared against every candidate."""
+    for sig in sigs:
+        best_cand = None; best_ratio = 0.0
+        na = norm_title(sig.title)
+        if not na.norm:
+            cands.append(Candidate(title=sig.title, signals=[sig])); continue
+        for c in cands:
+            nb = norm_title(c.title)
+            if not nb.norm: continue
+            if na.nums and nb.nums and na.nums != nb.nums: continue
+            if len(na.tokens & nb.tokens) / len(na.tokens | nb.tokens) < JACCARD_T: continue
+            r = SequenceMatcher(None, na.norm, nb.norm).ratio()
+            if r >= FUZZ_T and r > best_ratio: best_ratio = r; best_cand = c
+        if best_cand: best_cand.signals.append(sig)
+        else: cands.append(Candidate(title=sig.title, signals=[sig]))
+
+def _bench_signals(n, seed=11):
+    """n synthetic signals; about a third are re-worded copies of an earlier headline."""
+    rnd = random.Random(seed); base = _bench_titles(max(1, n * 2 // 3), seed)
+    sigs = []
+    for i in range(n):
+        t = base[i] if i < len(base) else rnd.choice(base)
+        if i >= len(base):
+            w = t.split(); rnd.shuffle(w) if rnd.random() < 0.2 else w.insert(rnd.randrange(len(w) + 1), "new")
+            t = " ".join(w) + rnd.choice(["", "!", " - report", " (update)"])
+        sigs.append(Signal("news", t, meta={"cats": cats(t)}))
+    return sigs
+
+def bench_dedup(sizes=(5_000, 50_000), naive_max=5_000):
+    """dedup's clustering with the token index and MinHash backends, against the all-pairs
+    reference (up to naive_max signals; above it, against the index backend)."""
+    global DEDUP_BACKEND
+    def grouping_diff(ref, got):
+        home = {id(s): k for k, c in enumerate(ref) for s in c.signals}
+        return sum(home[id(s)] != home[id(c.signals[0])] for c in got for s in c.signals)
+    for n in sizes:
+        sigs = _bench_signals(n); ref = None
+        if n <= naive_max:
+            norm_title.cache_clear()
+            t0 = time.perf_counter(); ref = []; _merge_into_cands_naive(sigs, ref); t_ref = time.perf_counter() - t0
+            print(f"  {n:>7,} signals  all-pairs: {t_ref:7.2f}s -> {len(ref):,} candidates")
+        for be in ("index", "minhash"):
+            DEDUP_BACKEND = be; norm_title.cache_clear()
+            t0 = time.perf_counter(); cands = _cluster(sigs); dt = time.perf_counter() - t0; ref = ref or cands
+            print(f"  {n:>7,} signals  {be:>9}: {dt:7.2f}s ({n/dt:,.0f} sig/s) -> {len(cands):,} candidates, "
+                  f"{grouping_diff(ref, cands)} grouped differently from {'all-pairs' if n <= naive_max else 'index'}; "
+                  f"{DEDUP_STATS.get('compared', 0):,} comparisons ("
+                  + ", ".join(f"{k[9:]} {v:,}" for k, v in DEDUP_STATS.items() if k.startswith("compared_")) + ")")
+        DEDUP_BACKEND = "index"
+
+def _bench_source_sigs(n, seed=13):
+    """n synthetic signals spread over the real sources, with fetcher-like meta and raw scores."""
+    rnd = random.Random(seed); srcs = list(SCORE_SPECS)
+    for i, t in enumerate(_bench_titles(n, seed)):
+        src = srcs[i % len(srcs)]
+        yield Signal(src, t, f"via {src}", url=f"https://example.com/{src}/{i}", score=rnd.uniform(0, 200),
+                     meta={"src": src, "cats": cats(t) or ["Gaming"], "age_h": rnd.randint(0, 200)})
+
+def bench_signals(n=100_000):
+    """Memory of n signals as {source: [Signal]} vs SignalTable, and the same scores/candidates from both."""
+    import tracemalloc
+    for _ in _bench_source_sigs(n): pass   # fill the title caches first so neither build pays for them
+    def build(table):
+        tracemalloc.start(); t0 = time.perf_counter()
+        if table: data = SignalTable(); [data.append(sg) for sg in _bench_source_sigs(n)]
+        else:
+            data = defaultdict(list)
+            for sg in _bench_source_sigs(n): data[sg.source].append(sg)
+        dt = time.perf_counter() - t0; mem = tracemalloc.get_traced_memory()[0]; tracemalloc.stop()
+        return data, dt, mem
+    print(f"Signal storage for {n:,} signals")
+    (old, t_old, m_old), (tab, t_tab, m_tab) = build(False), build(True)
+    print(f"  dict of Signal lists: {m_old/2**20:7.1f} MiB (built in {t_old:.2f}s)")
+    print(f"  SignalTable         : {m_tab/2**20:7.1f} MiB (built in {t_tab:.2f}s, {m_old/m_tab:.1f}x smaller)")
+    for name, data in (("dict", old), ("table", tab)):
+        t0 = time.perf_counter(); normalize_scores(data); print(f"  normalize_scores on {name:5}: {time.perf_counter() - t0:.3f}s")
+    got = [(s.source, s.title, s.score) for s in tab.rows()]
+    ref = [(s.source, s.title, s.score) for sigs in old.values() for s in sigs]
+    print(f"  {sum(a != b for a, b in zip(sorted(ref), sorted(got)))} signals differ after normalization")
+
+def _normalize_scores_ref(all_sig):
+    """Per-signal Python reference for normalize_scores."""
+    for source, signals in all_sig.items():
+        if not signals: continue
+        spec = SCORE_SPECS.get(source, ScoreSpec())
+        raw_scores = [s.score for s in signals]
+        src_min, src_max = min(raw_scores), max(raw_scores)
+        for s in signals:
+            if src_max > src_min:
+                normalized = spec.floor + (s.score - src_min) / (src_max - src_min) * (spec.ceiling - spec.floor)
+            else:
+                normalized = (spec.floor + spec.ceiling) / 2
+            s.score = round(min(100, max(0, normalized)), 1)
+
+def _comp_score_ref(cands):
+    """Per-candidate Python reference for comp_score."""
+    for c in cands:
+        by_src = defaultdict(list)
+        for s in c.signals:
+            st = s.source
+            if st in ("news","google"): st = "news"
+            by_src[st].append(s.score)
+        ws = 0.0; tw = 0.0
+        for st,scores in by_src.items():
+            w = W.get(st,0.04)
+            ws += (sum(scores)/len(scores))*w; tw += w
+        base = ws/tw if tw > 0 else 0
+        mult = CONF.get(c.sources, CONF_DEFAULT)
+        c.score = round(min(base * mult, 100), 1)
+    cands.sort(key=lambda x: -x.score)
+    return cands
+
+def bench_scoring(n=100_000, per_cand=3, seed=17):
+    """normalize_scores + comp_score on a SignalTable against the per-signal Python references,
+    over n signals grouped at random into about n/per_cand candidates."""
+    ref_sigs = list(_bench_source_sigs(n)); table = SignalTable(); by_src = defaultdict(list)
+    for s in ref_sigs: by_src[s.source].append(s); table.append(s)
+    rnd = random.Random(seed); home = [rnd.randrange(n // per_cand) for _ in range(n)]
+    def candidates(sigs):
+        groups = defaultdict(list)
+        for h, s in zip(home, sigs): groups[h].append(s)
+        cands = [Candidate(title=g[0].title, signals=g) for _, g in sorted(groups.items())]
+        for c in cands: c.sources = len({"news" if s.source == "google" else s.source for s in c.signals})
+        return cands
+    print(f"Scoring {n:,} signals from {len(by_src)} sources")
+    t0 = time.perf_counter(); _normalize_scores_ref(by_src); t_rn = time.perf_counter() - t0
+    t0 = time.perf_counter(); normalize_scores(table); t_n = time.perf_counter() - t0
+    diff = sum(a.score != b for a, b in zip(ref_sigs, table.score.tolist()))
+    print(f"  normalize_scores: {t_rn:6.3f}s -> {t_n:6.3f}s ({t_rn/t_n:5.1f}x), {diff} scores differ")
+    ties = {"trends": [Signal("trends", "", score=v) for v in [0.0, 100.0] + [k / 100 for k in range(5, 10_000, 10)]]}
+    tie_table = SignalTable()
+    for s in ties["trends"]: tie_table.append(Signal(s.source, s.title, score=s.score))
+    _normalize_scores_ref(ties); normalize_scores(tie_table)
+    diff = sum(a.score != b for a, b in zip(ties["trends"], tie_table.score.tolist()))
+    print(f"  .x5 ties        : {diff} of {len(ties['trends']):,} scores differ")
+    ref, got = candidates(ref_sigs), candidates(table.rows())
+    t0 = time.perf_counter(); _comp_score_ref(ref); t_rc = time.perf_counter() - t0
+    t0 = time.perf_counter(); comp_score(got); t_c = time.perf_counter() - t0
+    diff = sum((a.title, a.score) != (b.title, b.score) for a, b in zip(ref, got))
+    print(f"  comp_score      : {t_rc:6.3f}s -> {t_c:6.3f}s ({t_rc/t_c:5.1f}x) over {len(got):,} candidates, "
+          f"{diff} ranks differ")
+
+def bench_incremental(n=20_000, m=2_000, reruns=3, seed=19):
+    """ScoringEngine.add for m streamed signals on top of n, against rerunning the batch
+    normalize_scores + dedup + comp_score per new signal (timed for a few, extrapolated)."""
+    rnd = random.Random(seed); base = list(_bench_source_sigs(n))
+    stream = []
+    for _ in range(m):   # re-worded copies of earlier headlines, raw scores a little past the usual range
+        b = rnd.choice(base); w = b.title.split(); w.insert(rnd.randrange(len(w) + 1), "new")
+        stream.append(Signal(rnd.choice(list(SCORE_SPECS)), " ".join(w), url=b.url + "?v=2",
+                             score=rnd.uniform(-25, 225), meta={"cats": cats(b.title) or ["Gaming"]}))
+    print(f"Incremental scoring: {m:,} signals streamed onto {n:,}")
+    t0 = time.perf_counter(); eng = ScoringEngine({"all": base}); t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for sig in stream: eng.add(sig)
+    t_add = time.perf_counter() - t0
+    live = {id(c): c.score for c in eng.cands}; top = {id(c) for c in eng.ranked()[:50]}
+    eng.rebuild(); exact = eng.ranked()
+    drift = max(abs(live[id(c)] - c.score) for c in eng.cands)
+    t0 = time.perf_counter()
+    for k in range(reruns):
+        sigs = defaultdict(list)
+        for sg in base + stream[:k + 1]: sigs[sg.source].append(Signal(sg.source, sg.title, sg.desc, sg.url, sg.score, dict(sg.meta)))
+        normalize_scores(sigs); comp_score(dedup(sigs))
+    t_rerun = (time.perf_counter() - t0) / reruns
+    print(f"  engine load      : {t_load:7.2f}s -> {len(eng.cands):,} candidates")
+    print(f"  engine add       : {t_add / m * 1e3:7.2f}ms per signal ({eng.rebuilds - 2} full rescores of {m:,} adds)")
+    print(f"  batch rerun      : {t_rerun * 1e3:7.0f}ms per signal ({t_rerun * m / t_add:,.0f}x slower)")
+    print(f"  live vs rescored : max score drift {drift:.1f}, top 50 overlap {len(top & {id(c) for c in exact[:50]})}/50")
+
+def bench_backtest(runs=20, n=3_000, configs=2_000, seed=23):
+    """run_backtest over synthetic runs whose picks are the top 20 under hidden weights."""
+    rnd = np.random.default_rng(seed); srcs = list(SCORE_SPECS)
+    names = list(dict.fromkeys(srcs + list(W) + ["news"]))
+    hidden = [a[1:2] for a in backtest_configs(2, names, seed + 1)]
+    recs = []
+    for _ in range(runs):
+        rec = {"sources": srcs, "src": rnd.integers(0, len(srcs), n).tolist(), "raw": rnd.uniform(0, 200, n).round(3).tolist(),
+               "cand": rnd.integers(0, n // 3, n).tolist(), "titles": [f"c{k}" for k in range(n // 3)], "picked": []}
+        r = _BacktestRun(rec, names); r.pos[:] = True
+        sc = r.scores(*hidden)[0]; rec["picked"] = r.cands[np.argsort(-sc, kind="stable")[:20]].tolist()
+        recs.append((None, rec, None))
+    print(f"Backtest: {runs} runs x {n:,} signals, {configs:,} configurations")
+    t0 = time.perf_counter(); ranked, base = run_backtest(recs, configs, seed=seed); dt = time.perf_counter() - t0
+    check = np.mean([_BacktestRun(rec, names).evaluate(*hidden, top=20)[0][0] for _, rec, _ in recs])
+    print(f"  {dt:.2f}s ({configs * runs / dt:,.0f} run-configurations/s)")
+    print(f"  recall@20: current weights {base['recall']:.3f} (rank {base['rank']}), best {ranked[0]['recall']:.3f}, "
+          f"hidden weights {check:.3f}")
+
+def bench_archive(n=100_000, days=30):
+    """archive_signals for `days` daily partitions of n/days signals, then a full iter_archive scan
+    and its peak memory."""
+    import tempfile, tracemalloc
+    per = n // days; table = SignalTable()
+    for s in _bench_source_sigs(per): table.append(s)
+    raw = table.score.copy(); normalize_scores(table)
+    with tempfile.TemporaryDirectory() as root:
+        t0 = time.perf_counter()
+        for d in range(days): archive_signals(table, raw, root, (NOW - timedelta(days=days - d)).strftime("%Y-%m-%d"))
+        t_w = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(dp, f)) for dp, _, fs in os.walk(root) for f in fs)
+        tracemalloc.start(); t0 = time.perf_counter()
+        rows = sum(1 for _ in iter_archive(root=root)); t_r = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+        mid = (NOW - timedelta(days=days // 2)).strftime("%Y-%m-%d")
+        t0 = time.perf_counter(); part = sum(1 for _ in iter_archive(start=mid, sources={"news"}, root=root)); t_p = time.perf_counter() - t0
+    print(f"Signal archive: {days} daily partitions x {per:,} signals")
+    print(f"  write  : {t_w:6.2f}s, {size / 2**20:.1f} MiB on disk ({size / (per * days):.0f} bytes/signal)")
+    print(f"  scan   : {t_r:6.2f}s for {rows:,} rows ({rows / t_r:,.0f} rows/s), peak memory {peak / 2**10:,.0f} KiB")
+    print(f"  filter : {t_p:6.2f}s for {part:,} news rows since {mid}")
+
+TS_PLANTED = {("source", "flat"): [20] * 9,                                   # steady: nothing
+              ("entity", "Spike"): [10, 11, 9, 10, 12, 9, 10, 11, 40],        # spike
+              ("entity", "Climber"): [2, 3, 4, 5, 6, 7, 8, 9, 12],            # rising, under the spike z
+              ("entity", "Fading"): [30, 28, 25, 22, 20, 18, 15, 12, 10],     # falling: nothing
+              ("cat", "Small"): [None, 1, 0, 1, 0, 1, 0, 1, 4]}               # jump under TS_MIN_COUNT; no cats stored in week 0
+
+def check_timeseries(planted=TS_PLANTED, date=DATE):
+    """time_series_trends on planted weekly counts (last value = this run) from a stand-in store;
+    returns the problems found: the spike and the climber must be the only series flagged, and
+    nothing may spike with fewer than TS_MIN_WEEKS weeks of baseline."""
+    weeks = len(next(iter(planted.values()))) - 1
+    monday = datetime.strptime(date, "%Y-%m-%d") - timedelta(days=datetime.strptime(date, "%Y-%m-%d").weekday())
+    hist = [((monday - timedelta(weeks=weeks - j)).strftime("%Y-%m-%d"),
+             [(kind, name if v[j] is not None else None, v[j] or 0) for (kind, name), v in planted.items()]) for j in range(weeks)]
+    src = [k for k in planted if k[0] == "source"]; cat = [k for k in planted if k[0] == "cat"]
+    cur = {k: v[-1] for k, v in planted.items()}
+    sig = SimpleNamespace(src_names=[n for _, n in src], src=np.repeat(np.arange(len(src)), [cur[k] for k in src]),
+                          cat_names=[n for _, n in cat], cats=[(j,) for j, k in enumerate(cat) for _ in range(cur[k])])
+    cands = [SimpleNamespace(entity=n, signals=[None] * cur[kind, n]) for kind, n in planted if kind == "entity"]
+    problems = []
+    def flagged(ts, part): return {(e["kind"], e["name"]) for e in ts[part]}
+    ts = time_series_trends(cands, sig, SimpleNamespace(weekly_counts=lambda d: hist), date)
+    for part, want in (("spikes", {("entity", "Spike")}), ("rising", {("entity", "Climber")})):
+        if flagged(ts, part) != want: problems.append(f"{part}: {sorted(flagged(ts, part))}, expected {sorted(want)}")
+    if ts["series"] != len(planted): problems.append(f"{ts['series']} series, expected {len(planted)}")
+    if (h := next((e["history"] for e in ts["spikes"]), None)) != planted["entity", "Spike"]: problems.append(f"spike history {h}")
+    short = time_series_trends(cands, sig, SimpleNamespace(weekly_counts=lambda d: hist[-(TS_MIN_WEEKS - 1):]), date)
+    if short["spikes"]: problems.append(f"spikes with {TS_MIN_WEEKS - 1} baseline weeks: {sorted(flagged(short, 'spikes'))}")
+    return problems
+
+def bench_timeseries(n=100_000, weeks=TS_BASELINE_WEEKS, entities=2_000, seed=29):
+    """time_series_trends against `weeks` stored weekly runs of n signals each, one candidate per
+    signal with `entities` rollup entities, and a planted spike in this run."""
+    import tempfile
+    rnd = random.Random(seed); table = SignalTable()
+    for s in _bench_source_sigs(n, seed): table.append(s)
+    raw = table.score.copy(); normalize_scores(table)
+    cands = [Candidate(title=r.title, signals=[r], score=r.score, entity=f"E{rnd.randrange(entities)}") for r in table.rows()]
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(os.path.join(root, "history.db")); t0 = time.perf_counter()
+        for w in range(weeks, 0, -1): store.save_run({}, cands, table, raw, date=(NOW - timedelta(weeks=w)).strftime("%Y-%m-%d"))
+        t_w = time.perf_counter() - t0
+        for c in cands[:300]: c.entity = "E0"
+        t0 = time.perf_counter(); ts = time_series_trends(cands, table, store); dt = time.perf_counter() - t0
+        store.close()
+    print(f"Time series: {weeks} stored weeks x {n:,} signals, {ts['series']:,} series")
+    problems = check_timeseries()
+    print(f"  planted: {'ok' if not problems else 'FAILED - ' + '; '.join(problems)}")
+    print(f"  store  : {t_w:6.2f}s to write the history")
+    print(f"  trends : {dt:6.2f}s, {len(ts['spikes'])} spikes, {len(ts['rising'])} rising")
+    for _, line in series_lines(ts, 3): print(f"  > {line}")
+
+BENCHMARKS = {"kw": bench_kw, "dedup": bench_dedup, "signals": bench_signals, "scoring": bench_scoring,
+              "incremental": bench_incremental, "backtest": bench_backtest, "archive": bench_archive,
+              "timeseries": bench_timeseries}
+
+def run_bench(names):
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS: print(f"Unknown benchmark {name!r} (have: {', '.join(BENCHMARKS)})"); continue
+        BENCHMARKS[name]()
+
+# =============================================================================
+# SECTION 16 - BACKTEST
+# =============================================================================
+
+BACKTEST_TOP = int(os.environ.get("BACKTEST_TOP", "20"))      # a run's picks are looked for in its top N
+BACKTEST_LABELS = os.environ.get("BACKTEST_LABELS", "")       # optional {date: [titles]} outcomes, e.g. sales spikes
+BACKTEST_CHUNK = 256                                          # configurations scored per numpy pass
+
+def picked_ranks(cands, opps):
+    """Positions in cands of the candidates the AI opportunities refer to (the default backtest label)."""
+    pos = {id(c): k for k, c in enumerate(cands)}
+    return sorted({pos[id(mc)] for o in opps if (mc := _match_cand(o.get("title", ""), cands)) is not None})
+
+def load_backtest_runs(store=None):
+    """(date, scoring record, label titles or None) for every stored run with per-signal scores."""
+    labels = {}
+    if BACKTEST_LABELS:
+        with open(BACKTEST_LABELS) as f: labels = json.load(f)
+    return [(date, rec, labels.get(date)) for date, rec in (store or HISTORY).scoring_runs()]
+
+class _BacktestRun:
+    """One stored run laid out for scoring many configurations at once: signals sorted into
+    (candidate, source type) groups, so group means and candidate sums are two reduceats."""
+
+    def __init__(self, rec, names, label_titles=None):
+        ix = {n: k for k, n in enumerate(names)}
+        src = np.array([ix[n] for n in rec["sources"]], np.int64)[np.asarray(rec["src"], np.int64)]
+        typ = np.array([ix["news" if n == "google" else n] for n in rec["sources"]], np.int64)[np.asarray(rec["src"], np.int64)]
+        raw = np.asarray(rec["raw"], np.float64); cand = np.asarray(rec["cand"], np.int64)
+        keep = cand >= 0; src, typ, raw, cand = src[keep], typ[keep], raw[keep], cand[keep]
+        lo = np.full(len(names), np.inf); hi = np.full(len(names), -np.inf)
+        np.minimum.at(lo, src, raw); np.maximum.at(hi, src, raw); span = (hi - lo)[src]
+        t01 = np.divide(raw - lo[src], span, out=np.full(len(raw), 0.5), where=span > 0)   # min-max position, 0.5 if flat
+        key = cand * len(names) + typ; order = np.argsort(key, kind="stable")
+        keys, self.gstart, self.gcount = np.unique(key[order], return_index=True, return_counts=True)
+        self.spec, self.t01 = src[order], t01[order]
+        self.gtype, gcand = keys % len(names), keys // len(names)
+        self.cands, self.cstart, nsrc = np.unique(gcand, return_index=True, return_counts=True)
+        self.nconf = np.minimum(nsrc, 5)   # CONF column: number of source types, 5 = more than 4
+        if label_titles is not None:
+            idx = CandidateIndex([Candidate(title=t) for t in rec["titles"]])
+            picked = {rec["titles"].index(mc.title) for t in label_titles if (mc := idx.match(t))}
+        else: picked = set(rec.get("picked", []))
+        self.pos = np.isin(self.cands, sorted(picked))
+
+    def scores(self, floor, ceiling, w, conf):
+        """Composite scores (configs x candidates) for a block of configurations."""
+        f = floor[:, self.spec]
+        norm = np.clip(f + self.t01 * (ceiling[:, self.spec] - f), 0, 100)
+        mean = np.add.reduceat(norm, self.gstart, axis=1) / self.gcount
+        wg = w[:, self.gtype]
+        ws = np.add.reduceat(mean * wg, self.cstart, axis=1); tw = np.add.reduceat(wg, self.cstart, axis=1)
+        base = np.divide(ws, tw, out=np.zeros_like(ws), where=tw > 0)
+        return np.minimum(base * conf[:, self.nconf], 100)
+
+    def evaluate(self, floor, ceiling, w, conf, top=BACKTEST_TOP):
+        """Per config: share of the picks ranked in the top N, and their mean percentile rank."""
+        sc = self.scores(floor, ceiling, w, conf); n = sc.shape[1]; top = min(top, n)
+        best = np.argpartition(-sc, top - 1, axis=1)[:, :top]
+        recall = self.pos[best].sum(1) / min(self.pos.sum(), top)
+        ps = sc[:, self.pos]
+        pct = 1 - (sc[:, :, None] > ps[:, None, :]).sum(1).mean(1) / n
+        return recall, pct
+
+def backtest_configs(k, names, seed=0, spread=0.5):
+    """k configurations as (floor, ceiling, w, conf) arrays; row 0 is the current SCORE_SPECS/W/CONF,
+    the rest are random perturbations of it."""
+    rnd = np.random.default_rng(seed)
+    specs = [SCORE_SPECS.get(n, ScoreSpec()) for n in names]
+    f0 = np.array([sp.floor for sp in specs]); c0 = np.array([sp.ceiling for sp in specs])
+    w0 = np.array([W.get(n, 0.04) for n in names]); k0 = np.array([CONF_DEFAULT] + [CONF.get(i, CONF_DEFAULT) for i in range(1, 6)])
+    floor = np.clip(f0 + rnd.normal(0, 10, (k, len(names))), 0, 95)
+    ceiling = np.clip(np.maximum(c0 + rnd.normal(0, 10, (k, len(names))), floor + 5), 0, 100)
+    w = w0 * rnd.lognormal(0, spread, (k, len(names)))
+    conf = np.maximum.accumulate(np.minimum(k0 * rnd.lognormal(0, spread / 2, (k, 6)), 1.0), axis=1)   # confidence <= 1
+    floor[0], ceiling[0], w[0], conf[0] = f0, c0, w0, k0
+    return floor, ceiling, w, conf
+
+def run_backtest(runs, configs=2000, seed=0, top=BACKTEST_TOP, keep=20):
+    """Score every stored run under `configs` weight configurations, ranked by mean recall of the
+    labelled candidates in the top N (then by their mean percentile rank). Returns the best `keep`
+    and the current configuration (row 0)."""
+    names = list(dict.fromkeys(list(SCORE_SPECS) + list(W) + [n for _, rec, _ in runs for n in rec["sources"]] + ["news"]))
+    prepared = [_BacktestRun(rec, names, labels) for _, rec, labels in runs]
+    prepared = [r for r in prepared if r.pos.any()]
+    if not prepared: return [], None
+    floor, ceiling, w, conf = backtest_configs(configs, names, seed)
+    recall = np.zeros(configs); pct = np.zeros(configs)
+    for a in range(0, configs, BACKTEST_CHUNK):
+        b = slice(a, a + BACKTEST_CHUNK)
+        for r in prepared:
+            rc, pc = r.evaluate(floor[b], ceiling[b], w[b], conf[b], top); recall[b] += rc; pct[b] += pc
+    recall /= len(prepared); pct /= len(prepared)
+    ranked = np.lexsort((-pct, -recall)); rank = np.empty(configs, np.int64); rank[ranked] = np.arange(1, configs + 1)
+    def entry(k):
+        wk = w[k] / w[k, [j for j, n in enumerate(names) if n in W]].sum()
+        return {"rank": int(rank[k]), "config": int(k), "recall": round(float(recall[k]), 4), "percentile": round(float(pct[k]), 4),
+                "W": {n: round(float(wk[j]), 4) for j, n in enumerate(names) if n in W},
+                "CONF": {i: round(float(conf[k, i]), 3) for i in range(1, 5)},
+                "SCORE_SPECS": {n: [round(float(floor[k, j]), 1), round(float(ceiling[k, j]), 1)] for j, n in enumerate(names) if n in SCORE_SPECS}}
+    return [entry(k) for k in ranked[:keep]], entry(0)
+
+def backtest_main(args):
+    configs = int(args[0]) if args else 2000
+    runs = load_backtest_runs()
+    print(f"Backtest: {len(runs)} stored runs, {configs:,} configurations, picks looked for in the top {BACKTEST_TOP}")
+    t0 = time.perf_counter(); ranked, base = run_backtest(runs, configs); dt = time.perf_counter() - t0
+    if not ranked: print("  No runs with a scoring record and labelled picks yet."); return
+    print(f"  {dt:.1f}s; current weights: recall {base['recall']:.3f}, percentile {base['percentile']:.3f} (rank {base['rank']})")
+    for r in ranked[:5]:
+        moves = sorted(r["W"].items(), key=lambda kv: -abs(kv[1] - W[kv[0]] / sum(W.values())))[:4]
+        print(f"  #{r['rank']}: recall {r['recall']:.3f}, percentile {r['percentile']:.3f}; W " +
+              ", ".join(f"{n} {W[n] / sum(W.values()):.3f}->{v:.3f}" for n, v in moves))
+    out = f"backtest_{DATE}.json"
+    with open(out, "w") as f: json.dump({"baseline": base, "top": ranked}, f, indent=2)
+    print(f"  Top configurations saved: {out}")
+
+if __name__ == "__main__" and "--bench" in sys.argv:
+    run_bench(sys.argv[sys.argv.index("--bench") + 1:]); sys.exit(0)
+
+if __name__ == "__main__" and "--backtest" in sys.argv:
+    backtest_main(sys.argv[sys.argv.index("--backtest") + 1:]); sys.exit(0)
+
 if __name__ == "__main__":
     try:
         html_f, docx_f = main()